@@ -1,20 +1,31 @@
-from flask import Flask, render_template, request, redirect, url_for, send_file, jsonify, flash, session,  make_response
-from main import main
-import threading
+from flask import Flask, render_template, request, redirect, url_for, send_file, jsonify, flash, session,  make_response, Response, stream_with_context
+from main import main, write_report, appendix_path_for
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import os
 import logging
-import shutil
 from server import api_bp
-import sqlite3
+from fuzzing.result_sink import SQLiteSink
+from fuzzing.async_fuzzer import FUZZ_OPTION_FIELDS, fuzz_options_from
+from fuzzing.budget import BUDGET_FIELDS, budget_from_options
+from fuzzing.checkpoint import ScanCheckpoint
+from crawler.inventory import ScanInventory
+from workers.broker import make_broker
+from utils.progress import sse, sse_stream
+from workers.registry import ScanLogRouter, ScanRegistry, ScanState
+import time
+from database.pool import ConnectionPool
+from database.results import attempts_page, result_summary, vulnerabilities_page
 from flask_bcrypt import Bcrypt
 import re
 from functools import wraps
 import uuid
 
-# 🔥 /logs 경로 제외용 필터 클래스
+# 🔥 /logs, /events 경로 제외용 필터 클래스
 class ExcludeLogsFilter(logging.Filter):
     def filter(self, record):
-        return '/logs' not in record.getMessage()
+        message = record.getMessage()
+        return '/logs' not in message and '/events' not in message
 
 # 기존 핸들러 제거 (중복 방지)
 for handler in logging.root.handlers[:]:
@@ -47,22 +58,32 @@ app.secret_key = os.environ.get("SECRET_KEY", "fallback-secret-key")  # 세션
 
 bcrypt = Bcrypt(app)
 
+# 요청마다 새로 연결하지 않고 풀에서 재사용 (db.close()는 풀에 반환). 스키마는 풀 생성 시 최신 버전으로 마이그레이션
+db_pool = ConnectionPool("webfuzzer.db", size=int(os.environ.get("DB_POOL_SIZE", 8)))
+
 def get_db():
-    conn = sqlite3.connect("webfuzzer.db")
-    conn.row_factory = sqlite3.Row
-    return conn
-
-fuzzer_done = False
-fuzzer_data = {
-    "urls": [],
-    "results": [],
-    "vulnerabilities": [],
-    "attempts": []
-}
-log_start_pos = 0  # 크롤링 시작 시점의 로그 파일 위치
+    return db_pool.acquire()
+
 os.makedirs("results", exist_ok=True)  # 폴더 없으면 자동 생성
 
-fuzzer_result_id = None  #result id 변수
+# result_hash별 스캔 상태/로그. 동시에 SCAN_CONCURRENCY개까지 실행하고 나머지는 대기열에서 순서대로 시작
+scan_registry = ScanRegistry(max_concurrent=int(os.environ.get("SCAN_CONCURRENCY", 2)))
+# PDF 리포트는 스캔 스레드와 별도로 순서대로 생성 (큰 리포트가 다음 스캔의 시작을 막지 않도록)
+report_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("REPORT_WORKERS", 1)))
+scan_log_router = ScanLogRouter()
+scan_log_router.addFilter(ExcludeLogsFilter())
+logging.getLogger().addHandler(scan_log_router)
+
+# 공용 스캐너를 한 대상이 독점하지 않도록 사용자가 입력한 한도 위에 서버 측 상한을 적용
+SCAN_LIMITS = {
+    "max_requests": int(os.environ.get("SCAN_MAX_REQUESTS", 20000)),
+    "max_duration": float(os.environ.get("SCAN_MAX_DURATION", 1800)),
+}
+
+# SCAN_BROKER가 설정되면 (예: sqlite:///webfuzzer.db, redis://host:6379/0) 스캔을 직접 실행하지 않고
+# 작업 큐에 넣어 워커(python -m workers.worker)가 처리하도록 함
+SCAN_BROKER = os.environ.get("SCAN_BROKER")
+broker = make_broker(SCAN_BROKER) if SCAN_BROKER else None
 
 # 로그인 여부 확인
 def login_required(f):
@@ -95,7 +116,6 @@ def guide():
 
 @app.route("/loading", methods=["POST", "GET"])
 def loading():
-    global fuzzer_done, log_start_pos
     
     if request.method == "GET":
         # 직접 GET 요청 시 에러 안내 or 리다이렉트
@@ -111,121 +131,247 @@ def loading():
         return "크롤링 깊이는 숫자로 입력해주세요.", 400
 
     selected_payloads = request.form.getlist("payloads")
+    incremental = request.form.get("incremental") == "on"
+
+    budget_options = {field: request.form.get(field) for field in BUDGET_FIELDS}
+    try:
+        budget_from_options(budget_options, SCAN_LIMITS)
+    except ValueError:
+        return "스캔 한도는 양수로 입력해주세요.", 400
+
+    fuzz_settings = {field: request.form.get(field) for field in FUZZ_OPTION_FIELDS}
+    try:
+        fuzz_options_from(fuzz_settings)
+    except ValueError:
+        return "퍼징 옵션 값이 올바르지 않습니다.", 400
 
     if not target_url:
         return "URL이 필요합니다.", 400
 
-    # 퍼징 전에 로그 초기화
+    result_hash = generate_result_hash()
+    log_filename = f"results/fuzzer_logs_{result_hash}.txt"
+    pdf_filename = f"results/fuzzer_report_{result_hash}.pdf"
+
+    # ✅ 결과 행을 먼저 만들고, 시도/취약점은 스캔 중에 sink가 바로 DB에 기록
+    db = get_db()
+    cur = db.cursor()
+    cur.execute("""
+        INSERT INTO results (user_id, target_url, vuln_count, report_path, log_path, visibility, result_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (
+        user_id,
+        target_url,
+        0,
+        pdf_filename,
+        log_filename,
+        "private",
+        result_hash
+    ))
+    result_id = cur.lastrowid
+    db.commit()
+    db.close()
+
+    settings = {
+        "target_url": target_url,
+        "max_depth": max_depth,
+        "payloads": selected_payloads,
+        "budget": budget_options,
+        "fuzz": fuzz_settings,
+        "incremental": incremental
+    }
+
+    if broker:
+        enqueue_scan(result_id, result_hash, settings)
+        return render_template("loading.html", result_hash=result_hash)
+
+    # 재시작 후 해시만으로 이어서 스캔할 수 있도록 설정을 체크포인트에 저장
+    checkpoint = ScanCheckpoint(result_hash)
+    checkpoint.save_settings(settings)
+
+    start_scan(result_id, result_hash, checkpoint)
+    return render_template("loading.html", result_hash=result_hash)
+
+
+def enqueue_scan(result_id, result_hash, settings):
+    # 워커는 다른 머신에서 돌 수 있으므로 서버 측 상한을 미리 적용한 한도를 넘김
+    budget = budget_from_options(settings["budget"], SCAN_LIMITS)
+    broker.enqueue("scan", dict(
+        settings,
+        budget={field: getattr(budget, field) for field in BUDGET_FIELDS},
+        result_id=result_id,
+        result_hash=result_hash,
+        report_path=f"results/fuzzer_report_{result_hash}.pdf",
+        log_path=f"results/fuzzer_logs_{result_hash}.txt"
+    ), result_hash)
+
+
+def start_scan(result_id, result_hash, checkpoint):
+    # 스캔마다 별도의 상태/로그 파일. 동시 실행 한도를 넘으면 레지스트리에서 대기
+    state = ScanState(result_hash, result_id, session.get("user_id"), f"results/fuzzer_logs_{result_hash}.txt")
+    return scan_registry.submit(state, run_scan, checkpoint)
+
+
+def generate_report(state, urls, extraction, pdf_filename):
+    sink = SQLiteSink("webfuzzer.db", state.result_id)
     try:
-        with open("fuzzer.log", "w") as f:
-            f.truncate()
-        log_start_pos = 0
+        write_report(set(urls), extraction, sink.vulnerabilities, sink.attempts, pdf_filename)
     except Exception as e:
-        print(f"[!] 로그 초기화 실패: {e}")
-        log_start_pos = 0
-
-    fuzzer_done = False
-
-    def run_async(user_id):
-        global fuzzer_done, fuzzer_data, fuzzer_result_id
-        result_hash = generate_result_hash()
-
-        try:
-            urls, results, vulns, attempts = main(target_url, max_depth, selected_payloads)
-
-            fuzzer_data["urls"] = urls
-            fuzzer_data["results"] = results
-            fuzzer_data["vulnerabilities"] = vulns
-            fuzzer_data["attempts"] = attempts
-            log_filename = f"results/fuzzer_logs_{result_hash}.txt"
-            pdf_filename = f"results/fuzzer_report_{result_hash}.pdf"
-
-            shutil.copyfile("fuzzer.log", log_filename)
-            print("[*] 로그 복사 완료")
-
-            # ✅ DB에 저장
-            db = get_db()
-            cur = db.cursor()
-            cur.execute("""
-                INSERT INTO results (user_id, target_url, vuln_count, report_path, log_path, visibility, result_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                user_id,
-                target_url,
-                len(vulns),
-                pdf_filename,
-                log_filename,
-                "private",
-                result_hash
-            ))
-            result_id = cur.lastrowid
-            fuzzer_result_id = result_hash 
-
-            for v in vulns:
-                cur.execute("""
-                    INSERT INTO vulnerabilities (result_id, form, type, payload)
-                    VALUES (?, ?, ?, ?)
-                """, (
-                    result_id,
-                    v.get("form", ""),
-                    v.get("type", ""),
-                    v.get("payload", "")
-                ))
-
-            for a in attempts:
-                cur.execute("""
-                    INSERT INTO attempts (result_id, form, payload, response, is_successful)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    result_id,
-                    a.get("form", ""),
-                    a.get("payload", ""),
-                    a.get("response", ""),
-                    a.get("is_successful", False)
-                ))
-
-            db.commit()
-            db.close()
-
-            fuzzer_result_id = result_id  # INSERT 완료 후에 result_id 저장
-
-        except Exception as e:
-            print(f"[!] 비동기 fuzzer 실행 중 오류: {e}")
-
-        fuzzer_done = True
-
-    threading.Thread(target=run_async, args=(user_id,)).start()
-
-    return render_template("loading.html", result_id=None)
-
-@app.route("/logs")
-def get_logs():
-    global log_start_pos
-    global fuzzer_result_id
+        logger.error(f"[Report] 리포트 생성 실패: {e}")
+    finally:
+        sink.close()
+        # 스캔 스레드가 먼저 끝나 로그 파일을 닫았어도 리포트 로그를 쓰면서 다시 열리므로 여기서 닫음
+        state.close_log()
+
+
+def run_scan(state, checkpoint):
+    settings = checkpoint.load_settings()
+    pdf_filename = f"results/fuzzer_report_{state.result_hash}.pdf"
+    sink = None
+    inventory = None
+
+    try:
+        budget = budget_from_options(settings.get("budget") or {}, SCAN_LIMITS)
+        # 재개된 스캔이면 이전 실행에서 쓴 요청 수/시간부터 이어서 계산
+        budget.restore(checkpoint.load_budget())
+
+        sink = SQLiteSink("webfuzzer.db", state.result_id)
+        inventory = ScanInventory("webfuzzer.db", state.result_id, settings["target_url"])
+        urls, extraction, _, _ = main(settings["target_url"], settings["max_depth"], settings["payloads"],
+                                      sink=sink, budget=budget, checkpoint=checkpoint, inventory=inventory,
+                                      incremental=settings.get("incremental", False),
+                                      fuzz_options=fuzz_options_from(settings.get("fuzz") or {}),
+                                      report_path=None, progress=state.progress)
+
+        db = get_db()
+        db.execute("UPDATE results SET vuln_count = ? WHERE id = ?", (sink.vuln_count, state.result_id))
+        db.commit()
+        db.close()
+        checkpoint.mark_finished()
+
+        # 리포트는 스캔 완료를 늦추지 않도록 백그라운드에서 생성 (로그는 같은 스캔 로그 파일로)
+        report_executor.submit(contextvars.copy_context().run, generate_report, state, urls, extraction,
+                               pdf_filename)
+    finally:
+        if sink:
+            sink.close()
+        if inventory:
+            inventory.close()
+        checkpoint.close()
 
+
+@app.route("/resume/<string:result_hash>", methods=["POST"])
+@login_required
+def resume(result_hash):
     db = get_db()
-    cur = db.cursor()
-    result_hash = None
-    if fuzzer_result_id:
-        cur.execute("SELECT result_hash FROM results WHERE id = ?", (fuzzer_result_id,))
-        row = cur.fetchone()
-        if row:
-            result_hash = row["result_hash"]
+    row = db.execute("SELECT id, user_id FROM results WHERE result_hash = ?", (result_hash,)).fetchone()
+    db.close()
+    if not row:
+        return "결과를 찾을 수 없습니다.", 404
+    if row["user_id"] != session.get("user_id"):
+        return "접근 권한이 없습니다.", 403
+    if not ScanCheckpoint.exists(result_hash):
+        return "재개할 수 있는 체크포인트가 없습니다.", 404
 
+    if scan_registry.is_active(result_hash):
+        return render_template("loading.html", result_hash=result_hash)
+
+    checkpoint = ScanCheckpoint(result_hash)
+    if checkpoint.load_settings().get("finished"):
+        return redirect(url_for("view_result", result_hash=result_hash))
+
+    # 크롤링/완료된 요청은 체크포인트에서 건너뛰고 남은 작업만 이어서 실행
+    try:
+        start_scan(row["id"], result_hash, checkpoint)
+    except ValueError:
+        return "이미 진행 중인 스캔입니다.", 409
+    return render_template("loading.html", result_hash=result_hash)
+
+
+def scan_access(result_hash):
+    # 진행 상황도 결과와 같은 공개 범위. 레지스트리에 있으면 DB를 열지 않음
+    state = scan_registry.get(result_hash)
+    if state is not None:
+        return state.user_id == session.get("user_id")
+    db = get_db()
+    row = db.execute("SELECT user_id, visibility FROM results WHERE result_hash = ?", (result_hash,)).fetchone()
+    db.close()
+    return row is not None and (row["visibility"] != "private" or row["user_id"] == session.get("user_id"))
+
+
+@app.route("/events/<string:result_hash>")
+def events(result_hash):
+    # 진행 상황을 Server-Sent Events로 푸시 (stage, page, form, request, finding, log 이벤트 + 주기적인 stats)
+    # ?kinds=page,finding 처럼 받을 이벤트 종류를 고를 수 있음. 재연결 시 Last-Event-ID 이후부터 이어서 전송
+    if not scan_access(result_hash):
+        return "접근 권한이 없습니다.", 403
+    kinds = request.args.get("kinds")
+    kinds = set(kinds.split(",")) if kinds else None
     try:
-        with open("fuzzer.log", "rb") as f:
-            f.seek(log_start_pos)
-            new_logs = f.read().decode("utf-8", errors="ignore")
-    except FileNotFoundError:
-        new_logs = "[INFO] 로그 파일이 아직 생성되지 않았습니다."
+        last_id = request.headers.get("Last-Event-ID")
+        offset = int(last_id) + 1 if last_id else int(request.args.get("offset", 0))
+    except ValueError:
+        return "offset은 숫자여야 합니다.", 400
+
+    state = scan_registry.get(result_hash)
+    if broker:
+        stream = broker_stream(result_hash)
+    elif state is not None:
+        stream = sse_stream(state.progress, offset, kinds)
+    else:
+        return "진행 중인 스캔이 없습니다.", 404
+    return Response(stream_with_context(stream), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def broker_stream(result_hash, interval=2.0):
+    # 워커의 이벤트는 각 머신에 있으므로 브로커에 기록된 집계만 주기적으로 전송
+    while True:
+        status = broker.scan_status(result_hash)
+        yield sse("stats", dict(status["progress"], stage=status["state"], jobs=status["jobs"]))
+        if status["state"] in ("done", "failed"):
+            yield sse("done", {"result_hash": result_hash, "stage": status["state"]})
+            return
+        time.sleep(interval)
+
+
+@app.route("/logs/<string:result_hash>")
+def get_logs(result_hash):
+    # SSE를 쓸 수 없는 클라이언트용: ?offset= 이후의 로그 이벤트만 반환 (파일/DB를 다시 읽지 않음)
+    if not scan_access(result_hash):
+        return "접근 권한이 없습니다.", 403
+    if broker:
+        return jsonify(broker_logs(result_hash))
+    state = scan_registry.get(result_hash)
+    if state is None:
+        return "진행 중인 스캔이 없습니다.", 404
 
+    try:
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return "offset은 숫자여야 합니다.", 400
+    logs, _, offset = state.progress.since(offset)
     return jsonify({
-        "logs": new_logs,
-        "done": fuzzer_done,
-        "result_id": fuzzer_result_id,
+        "logs": "".join(e["message"] + "\n" for e in logs if e["kind"] == "log"),
+        "offset": offset,
+        "status": state.status,
+        "stats": state.progress.stats(),
+        "done": state.progress.finished,
         "result_hash": result_hash
     })
 
+
+def broker_logs(result_hash):
+    # 워커 로그는 각 머신에 남으므로 브로커에 기록된 작업 상태/진행 상황을 대신 보여줌
+    status = broker.scan_status(result_hash)
+    jobs = ", ".join(f"{k}={v}" for k, v in sorted(status["jobs"].items()))
+    progress = ", ".join(f"{k}={v}" for k, v in sorted(status["progress"].items()))
+    return {
+        "logs": f"[Broker] {status['state']} | jobs: {jobs} | {progress}\n",
+        "status": status["state"],
+        "done": status["state"] in ("done", "failed"),
+        "result_hash": result_hash
+    }
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
@@ -301,7 +447,11 @@ def history():
         (user_id,)
     ).fetchall()
 
-    return render_template("history.html", results=results)
+    # 중단된 스캔(체크포인트가 있고 완료 표시가 없는 것)은 재개 버튼을 보여줌
+    resumable = {r["result_hash"] for r in results if ScanCheckpoint.resumable(r["result_hash"])}
+    resumable -= scan_registry.active_hashes()
+
+    return render_template("history.html", results=results, resumable=resumable)
 
 # @app.route("/result/<int:result_id>")
 # def view_result(result_id):
@@ -337,39 +487,68 @@ def history():
 #         result=result
 #     )
 
-@app.route("/result/<string:result_hash>")
-def view_result(result_hash):
+def load_result(result_hash):
+    # (결과 행, 오류 응답). 비공개 결과는 소유자만 볼 수 있음
     db = get_db()
-    cur = db.cursor()
-
-    cur.execute("SELECT * FROM results WHERE result_hash = ?", (result_hash,))
-    result = cur.fetchone()
+    result = db.execute("SELECT * FROM results WHERE result_hash = ?", (result_hash,)).fetchone()
+    db.close()
     if not result:
-        return "결과를 찾을 수 없습니다.", 404
+        return None, ("결과를 찾을 수 없습니다.", 404)
+    if result["visibility"] == "private" and result["user_id"] != session.get("user_id"):
+        return None, ("접근 권한이 없습니다.", 403)
+    return result, None
 
-    visibility = result["visibility"]
-    user_id = session.get("user_id")
 
-    if visibility == "private" and result["user_id"] != user_id:
-        return "접근 권한이 없습니다.", 403
+@app.route("/result/<string:result_hash>")
+def view_result(result_hash):
+    # 시도/취약점 목록과 통계는 페이지에서 /api/results/<hash>/... 로 필요할 때 불러옴
+    result, error = load_result(result_hash)
+    if error:
+        return error
+    return render_template("result.html", result=result)
+
+
+@app.route("/api/results/<string:result_hash>/summary")
+def result_summary_api(result_hash):
+    result, error = load_result(result_hash)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    db = get_db()
+    summary = result_summary(db, result["id"])
+    db.close()
+    return jsonify(summary)
 
-    cur.execute("SELECT form, type, payload FROM vulnerabilities WHERE result_id = ?", (result["id"],))
-    vulnerabilities = [dict(row) for row in cur.fetchall()]
 
-    cur.execute("SELECT form, payload, response, is_successful FROM attempts WHERE result_id = ?", (result["id"],))
-    attempts = [dict(row) for row in cur.fetchall()]
+@app.route("/api/results/<string:result_hash>/attempts")
+def result_attempts_api(result_hash):
+    # ?after=<마지막 id>&limit=&category=&result=&status=&parameter=&successful=0|1
+    result, error = load_result(result_hash)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    db = get_db()
+    try:
+        page = attempts_page(db, result["id"], request.args)
+    except ValueError:
+        return jsonify({"error": "after는 0 이상의 숫자여야 합니다."}), 400
+    finally:
+        db.close()
+    return jsonify(page)
 
-    vulnCounts = {}
-    for v in vulnerabilities:
-        t = v.get("type", "unknown")
-        vulnCounts[t] = vulnCounts.get(t, 0) + 1
 
-    return render_template("result.html",
-        vulnerabilities=vulnerabilities,
-        attempts=attempts,
-        vulnCounts=vulnCounts,
-        result=result
-    )
+@app.route("/api/results/<string:result_hash>/vulnerabilities")
+def result_vulnerabilities_api(result_hash):
+    # ?after=<마지막 id>&limit=&type=&form=&parameter=
+    result, error = load_result(result_hash)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    db = get_db()
+    try:
+        page = vulnerabilities_page(db, result["id"], request.args)
+    except ValueError:
+        return jsonify({"error": "after는 0 이상의 숫자여야 합니다."}), 400
+    finally:
+        db.close()
+    return jsonify(page)
 
 @app.route("/download-logs/<string:result_hash>")
 def download_logs(result_hash):
@@ -387,7 +566,21 @@ def download_pdf(result_hash):
     db.close()
     if not row:
         return "파일을 찾을 수 없습니다.", 404
+    # 리포트는 스캔이 끝난 뒤 백그라운드에서 만들어지므로 아직 없을 수 있음
+    if not os.path.exists(row["report_path"]):
+        return "리포트를 생성 중입니다. 잠시 후 다시 시도해주세요.", 202
     return send_file(row["report_path"], as_attachment=True)
 
+@app.route("/download-attempts/<string:result_hash>")
+def download_attempts(result_hash):
+    # 리포트에는 요약만 들어가고 전체 시도 기록은 CSV 부록으로 제공
+    result, error = load_result(result_hash)
+    if error:
+        return error
+    path = appendix_path_for(result["report_path"])
+    if not os.path.exists(path):
+        return "리포트를 생성 중입니다. 잠시 후 다시 시도해주세요.", 202
+    return send_file(path, as_attachment=True)
+
 if __name__ == "__main__":
     app.run(debug=True, port=5001)
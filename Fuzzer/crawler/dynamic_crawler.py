@@ -1,17 +1,70 @@
-from urllib.parse import urlparse, urljoin, urldefrag
+from urllib.parse import urlparse, urljoin
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from bs4 import BeautifulSoup
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from crawler.static_crawler import normalize_url
 from utils.logger import get_logger
+import contextvars
+import os
+import queue
+import threading
 import time
 
 logger = get_logger()
 
-def normalize_url(url):
-    return urldefrag(url.rstrip('/'))[0]
+# DOM 변경(MutationObserver)과 진행 중인 fetch/XHR 수를 추적하는 스크립트
+READY_STATE_SCRIPT = """
+if (!window.__wfReady) {
+    const state = window.__wfReady = {last: Date.now(), pending: 0};
+    new MutationObserver(() => { state.last = Date.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function() {
+            state.pending++;
+            return origFetch.apply(this, arguments).finally(() => { state.pending--; state.last = Date.now(); });
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.pending++;
+        this.addEventListener('loadend', () => { state.pending--; state.last = Date.now(); });
+        return origSend.apply(this, arguments);
+    };
+}
+return [document.readyState, Date.now() - window.__wfReady.last, window.__wfReady.pending];
+"""
+
+
+def wait_until_ready(driver, timeout=10, quiet_ms=300, poll=0.1):
+    # 고정 sleep 대신: readyState == complete → 네트워크 idle + DOM 변경이 quiet_ms 동안 없을 때까지 대기
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            ready_state, idle_ms, pending = driver.execute_script(READY_STATE_SCRIPT)
+        except WebDriverException:
+            return False
+        if ready_state == 'complete' and pending <= 0 and idle_ms >= quiet_ms:
+            return True
+        time.sleep(poll)
+    return False
+
+
+def create_driver(page_load_timeout=10):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
 
 def extract_urls_dynamic(driver, base_url):
     urls = set()
@@ -64,7 +117,7 @@ def crawl_dynamic(driver, base_url, max_depth, visited_urls, extraction_results,
         try:
             driver.set_page_load_timeout(10)
             driver.get(current_url)
-            time.sleep(1.5)
+            wait_until_ready(driver)
 
             real_url = normalize_url(driver.current_url)
             if robot_parser and not robot_parser.can_fetch('*', real_url):
@@ -89,3 +142,102 @@ def crawl_dynamic(driver, base_url, max_depth, visited_urls, extraction_results,
 
     return extraction_results  # 마지막에 반환 추가
 
+
+class BrowserPool:
+    # N개의 headless Chrome이 공유 frontier에서 URL을 가져가 병렬로 방문 (브라우저는 페이지 간 재사용)
+    def __init__(self, base_url, max_depth, visited_urls, extraction_results, robot_parser=None,
+                 workers=None, driver_factory=create_driver):
+        self.base_url = base_url
+        self.max_depth = max_depth
+        self.visited_urls = visited_urls
+        self.extraction_results = extraction_results
+        self.robot_parser = robot_parser
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.driver_factory = driver_factory
+        self.frontier = queue.Queue()
+        self.seen = set()
+        self.lock = threading.Lock()
+        self.alive = self.workers
+
+    def enqueue(self, url, depth):
+        if depth > self.max_depth:
+            return
+        with self.lock:
+            if url in self.seen or url in self.visited_urls:
+                return
+            self.seen.add(url)
+        self.frontier.put((url, depth))
+
+    def visit(self, driver, current_url, depth):
+        driver.get(current_url)
+        wait_until_ready(driver)
+
+        real_url = normalize_url(driver.current_url)
+        if self.robot_parser and not self.robot_parser.can_fetch('*', real_url):
+            logger.info(f"[DynamicCrawler] robots.txt 차단됨: {real_url}")
+            return
+
+        with self.lock:
+            if real_url in self.visited_urls:
+                return
+            self.visited_urls.add(real_url)
+        logger.info(f"[DynamicCrawler] 방문: {real_url}")
+
+        forms, inputs = extract_forms_dynamic(driver, real_url)
+        with self.lock:
+            self.extraction_results.append({'url': real_url, 'forms': forms, 'independent_inputs': inputs})
+
+        for u in extract_urls_dynamic(driver, self.base_url):
+            self.enqueue(u, depth + 1)
+
+    def worker(self):
+        driver = None
+        try:
+            driver = self.driver_factory()
+            while True:
+                item = self.frontier.get()
+                if item is None:
+                    self.frontier.task_done()
+                    return
+                try:
+                    self.visit(driver, *item)
+                except Exception as e:
+                    logger.error(f"[DynamicCrawler] 오류: {e}")
+                finally:
+                    self.frontier.task_done()
+        except Exception as e:
+            logger.error(f"[DynamicCrawler] 브라우저 시작 실패: {e}")
+            with self.lock:
+                self.alive -= 1
+                last = self.alive == 0
+            # 남은 브라우저가 없으면 frontier를 비워서 crawl()이 멈추지 않게 함
+            if last:
+                self.drain()
+        finally:
+            if driver:
+                driver.quit()
+
+    def drain(self):
+        while True:
+            try:
+                self.frontier.get_nowait()
+            except queue.Empty:
+                return
+            self.frontier.task_done()
+
+    def crawl(self, seeds=None):
+        logger.info(f"[DynamicCrawler] Start. ({self.workers} browsers)")
+        # seeds: 브라우저로 열어야 할 (url, depth) 목록, 없으면 base_url부터 시작
+        for url, depth in seeds or [(self.base_url, 0)]:
+            self.enqueue(normalize_url(url), depth)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # 로그가 호출한 스캔으로 전달되도록 현재 컨텍스트(contextvars)를 워커 스레드에 넘김
+            futures = [executor.submit(contextvars.copy_context().run, self.worker) for _ in range(self.workers)]
+            self.frontier.join()
+            for _ in futures:
+                self.frontier.put(None)
+        return self.extraction_results
+
+
+def crawl_dynamic_parallel(base_url, max_depth, visited_urls, extraction_results, robot_parser=None, workers=None):
+    return BrowserPool(base_url, max_depth, visited_urls, extraction_results, robot_parser, workers).crawl()
@@ -0,0 +1,46 @@
+from crawler.static_crawler import AsyncStaticCrawler
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def conditional_headers(page):
+    headers = {}
+    if page.get('etag'):
+        headers['If-None-Match'] = page['etag']
+    if page.get('last_modified'):
+        headers['If-Modified-Since'] = page['last_modified']
+    return headers or None
+
+
+class IncrementalCrawler(AsyncStaticCrawler):
+    # previous_pages: {url: 이전 스캔의 페이지 추출 결과} — 모든 이전 URL을 시드로 넣고 조건부 요청으로 재검증
+    def __init__(self, base_url, previous_pages, robot_parser=None, max_depth=None, **kwargs):
+        super().__init__(base_url, robot_parser, max_depth=max_depth, **kwargs)
+        self.previous = {self.normalize(url): page for url, page in previous_pages.items()}
+        self.unchanged = set()
+
+    def seed(self):
+        super().seed()
+        for url, page in self.previous.items():
+            self.enqueue(url, page.get('depth') or 0)
+
+    def request_headers(self, url):
+        page = self.previous.get(url)
+        return conditional_headers(page) if page else None
+
+    def not_modified(self, url, depth):
+        # 304: 본문을 받지 않고 이전 결과를 재사용 (이 페이지의 링크는 이미 시드에 포함됨)
+        result = dict(self.previous[url], url=url, depth=depth, unchanged=True)
+        self.unchanged.add(url)
+        self.extraction_results.append(result)
+        return result
+
+    async def crawl_async(self):
+        results = await super().crawl_async()
+        known = set(self.previous)
+        fetched = {r['url'] for r in results}
+        logger.info(f"[StaticCrawler] Incremental: {len(self.unchanged)} unchanged, "
+                    f"{len(fetched & known) - len(self.unchanged)} changed, {len(fetched - known)} new, "
+                    f"{len(known - fetched)} gone")
+        return results
@@ -0,0 +1,82 @@
+import json
+from collections import Counter, namedtuple
+
+from database.schema import connect, init_db
+from fuzzing.form_index import FormIndex, form_key, normalize_action
+from utils.logger import get_logger
+
+logger = get_logger()
+
+PreviousScan = namedtuple('PreviousScan', ['result_id', 'pages', 'findings'])
+
+
+class ScanInventory:
+    # 스캔별 페이지 목록을 results와 같은 DB에 저장 → 같은 타겟 URL의 다음 스캔이 증분 모드로 재사용
+    def __init__(self, db_path, result_id, target_url):
+        self.result_id = result_id
+        self.target_url = target_url
+        init_db(db_path)
+        self.conn = connect(db_path)
+
+    def save_pages(self, extraction):
+        rows = []
+        for page in extraction:
+            page = {k: v for k, v in page.items() if k != 'unchanged'}
+            rows.append((self.result_id, page['url'], json.dumps(page, ensure_ascii=False)))
+        with self.conn:
+            self.conn.execute("DELETE FROM crawl_pages WHERE result_id = ?", (self.result_id,))
+            self.conn.executemany("INSERT INTO crawl_pages (result_id, url, page) VALUES (?, ?, ?)", rows)
+
+    def previous(self):
+        # 페이지 목록은 퍼징이 끝까지 진행된 스캔에만 저장되므로, 목록이 있는 가장 최근 스캔을 기준으로 삼음
+        row = self.conn.execute("""
+            SELECT r.id FROM results r
+            WHERE r.target_url = ? AND r.id != ?
+              AND EXISTS (SELECT 1 FROM crawl_pages p WHERE p.result_id = r.id)
+            ORDER BY r.id DESC LIMIT 1
+        """, (self.target_url, self.result_id)).fetchone()
+        if not row:
+            return None
+        result_id = row[0]
+        pages = {}
+        for url, page in self.conn.execute("SELECT url, page FROM crawl_pages WHERE result_id = ?", (result_id,)):
+            pages[url] = json.loads(page)
+        return PreviousScan(result_id, pages, self.findings(result_id))
+
+    def findings(self, result_id):
+        # {정규화된 action: {category: [탐지에 성공한 페이로드]}}
+        findings = {}
+        for form, category, payload in self.conn.execute("""
+            SELECT DISTINCT form, category, payload FROM attempts
+            WHERE result_id = ? AND is_successful = 1 AND category IS NOT NULL
+        """, (result_id,)):
+            payloads = findings.setdefault(normalize_action(form), {}).setdefault(category, [])
+            if payload not in payloads:
+                payloads.append(payload)
+        return findings
+
+    def close(self):
+        self.conn.close()
+
+
+def plan_incremental(forms, previous, group_inputs=False):
+    # 새로 생기거나 바뀐 폼 → 전체 퍼징, 이전에 취약했던 폼 → 탐지됐던 페이로드로만 회귀 확인, 나머지는 건너뜀
+    previous_index = FormIndex(group_inputs=group_inputs)
+    previous_index.add_extraction(previous.pages.values())
+    counts = Counter()
+    planned = []
+    for form in forms:
+        key = form_key(form)
+        if key not in previous_index.entries:
+            counts['full'] += 1
+            planned.append(form)
+            continue
+        payloads = previous.findings.get(key[0])
+        if payloads:
+            counts['regression'] += 1
+            planned.append(dict(form, payloads=payloads))
+        else:
+            counts['skipped'] += 1
+    logger.info(f"[Incremental] Based on scan #{previous.result_id}: {counts['full']} new/changed forms, "
+                f"{counts['regression']} regression checks, {counts['skipped']} unchanged forms skipped")
+    return planned
@@ -0,0 +1,75 @@
+from crawler.static_crawler import AsyncStaticCrawler, normalize_url
+from crawler.incremental import IncrementalCrawler
+from crawler.dynamic_crawler import BrowserPool
+from fuzzing.form_index import form_key
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+# 증분 스캔용으로 페이지 단위로 보존하는 값
+PAGE_FIELDS = ('depth', 'js_driven', 'etag', 'last_modified', 'unchanged')
+
+
+def merge_extractions(*result_lists):
+    # 정적/동적 단계에서 찾은 폼을 URL별로 합치고 중복 제거
+    merged = {}
+    for results in result_lists:
+        for result in results:
+            url = normalize_url(result['url'])
+            page = merged.setdefault(url, {'url': url, 'forms': [], 'independent_inputs': [], 'form_keys': set(), 'input_keys': set()})
+            for field in PAGE_FIELDS:
+                if page.get(field) is None and result.get(field) is not None:
+                    page[field] = result[field]
+            for form in result.get('forms', []):
+                key = form_key(form)
+                if key not in page['form_keys']:
+                    page['form_keys'].add(key)
+                    page['forms'].append(form)
+            for field in result.get('independent_inputs', []):
+                key = (field.get('name'), field.get('type'))
+                if key not in page['input_keys']:
+                    page['input_keys'].add(key)
+                    page['independent_inputs'].append(field)
+    for page in merged.values():
+        del page['form_keys'], page['input_keys']
+    return list(merged.values())
+
+
+def crawl_pipeline(base_url, max_depth, robot_parser=None, browser_workers=None, checkpoint=None,
+                   previous_pages=None, progress=None):
+    logger.info("[StaticCrawler] Start.")
+    if previous_pages:
+        # 이전 스캔의 페이지를 조건부 요청으로 재검증, 바뀐 페이지에서만 새 링크를 따라감
+        crawler = IncrementalCrawler(base_url, previous_pages, robot_parser, max_depth=max_depth, checkpoint=checkpoint,
+                                     progress=progress)
+    else:
+        crawler = AsyncStaticCrawler(base_url, robot_parser, max_depth=max_depth, checkpoint=checkpoint,
+                                     progress=progress)
+    static_results = crawler.crawl()
+    static_urls = {normalize_url(r['url']) for r in static_results}
+
+    # 변경되지 않은 페이지(304)는 이전 결과(동적 크롤링 결과 포함)를 그대로 사용
+    js_pages = [(r['url'], r.get('depth', 0)) for r in static_results if r.get('js_driven') and not r.get('unchanged')]
+    if not static_results:
+        # 정적 요청이 모두 실패하면 브라우저로 처음부터 크롤링
+        js_pages = [(base_url, 0)]
+
+    visited, dynamic_results = set(), []
+    if js_pages:
+        logger.info(f"[DynamicCrawler] {len(js_pages)}/{len(static_results)} pages need a browser")
+        # JS가 필요 없는 페이지는 이미 방문한 것으로 처리 → 브라우저가 다시 열지 않음
+        js_urls = {normalize_url(u) for u, _ in js_pages}
+        visited.update(static_urls - js_urls)
+        pool = BrowserPool(base_url, max_depth, visited, dynamic_results, robot_parser, browser_workers)
+        pool.crawl(seeds=js_pages)
+        if progress:
+            for result in dynamic_results:
+                progress.emit('page', url=result['url'], depth=result.get('depth', 0),
+                              forms=len(result.get('forms', [])), js_driven=True)
+    else:
+        logger.info("[DynamicCrawler] No JS-driven pages, browser crawl skipped")
+
+    extraction = merge_extractions(static_results, dynamic_results)
+    crawled_urls = static_urls | visited
+    return crawled_urls, extraction
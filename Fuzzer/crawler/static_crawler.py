@@ -1,11 +1,38 @@
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urldefrag
+import asyncio
+import aiohttp
 import requests
 from bs4 import BeautifulSoup
 from collections import deque
 from utils.logger import get_logger
+import re
 
 logger = get_logger()
 
+SPA_MARKERS = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>|ng-app|data-reactroot|__NEXT_DATA__|window\.__NUXT__|data-v-[0-9a-f]{6,}',
+    re.IGNORECASE
+)
+
+
+def normalize_url(url):
+    # 정적/동적 크롤러와 파이프라인이 같은 방문 집합을 쓰므로 URL 키는 여기서만 만듦
+    # (프래그먼트를 먼저 떼야 /page/#x 와 /page 가 같은 키가 됨)
+    return urldefrag(url)[0].rstrip('/')
+
+
+def looks_js_driven(soup, text):
+    # 원본 HTML만으로 충분한 페이지는 브라우저로 다시 열지 않음
+    if SPA_MARKERS.search(text):
+        return True
+    scripts = soup.find_all('script')
+    if not scripts:
+        return False
+    if not soup.find_all(['form', 'input', 'textarea']):
+        return True
+    script_bytes = sum(len(s.string or '') for s in scripts)
+    return len(scripts) >= 10 or script_bytes > len(text) * 0.5
+
 class StaticCrawler:
     def __init__(self, base_url, robot_parser=None):
         self.base_url = base_url
@@ -68,3 +95,122 @@ class StaticCrawler:
                 continue
         return self.extraction_results
 
+
+
+class AsyncStaticCrawler(StaticCrawler):
+    def __init__(self, base_url, robot_parser=None, max_depth=None, concurrency=8, timeout=10, checkpoint=None,
+                 progress=None):
+        super().__init__(base_url, robot_parser)
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.timeout = timeout
+        # 큐에 넣기 전에 중복 제거 → 같은 URL이 frontier에 두 번 들어가지 않음
+        self.seen = set()
+        self.frontier = None
+        # 큐에 넣은 URL과 방문 결과를 기록해 두고, 재개 시 남은 frontier부터 이어서 크롤링
+        self.checkpoint = checkpoint
+        # 방문한 페이지를 진행 상황 이벤트로 전달 (utils.progress.ScanProgress)
+        self.progress = progress
+
+    def normalize(self, url):
+        return normalize_url(url)
+
+    def enqueue(self, url, depth):
+        url = self.normalize(url)
+        if url in self.seen:
+            return
+        if self.max_depth is not None and depth > self.max_depth:
+            return
+        self.seen.add(url)
+        if self.checkpoint:
+            self.checkpoint.record_enqueue(url, depth)
+        self.frontier.put_nowait((url, depth))
+
+    async def fetch(self, session, url, depth):
+        self.visited.add(url)
+        result = await self.fetch_page(session, url, depth)
+        if self.checkpoint:
+            self.checkpoint.record_page(url, result)
+        if self.progress and result:
+            self.progress.emit('page', url=url, depth=depth, forms=len(result.get('forms', [])),
+                               unchanged=bool(result.get('unchanged')))
+
+    def request_headers(self, url):
+        return None
+
+    def not_modified(self, url, depth):
+        return None
+
+    async def fetch_page(self, session, url, depth):
+        try:
+            logger.info(f"[StaticCrawler] 방문 중: {url}")
+            async with session.get(url, headers=self.request_headers(url)) as resp:
+                if resp.status == 304:
+                    return self.not_modified(url, depth)
+                if resp.status != 200:
+                    logger.warning(f"Status Code is Wrong!!: {resp.status} - {url}")
+                    return
+                text = await resp.text(errors='replace')
+                # 다음 증분 스캔에서 조건부 요청(If-None-Match / If-Modified-Since)에 사용
+                validators = {'etag': resp.headers.get('ETag'), 'last_modified': resp.headers.get('Last-Modified')}
+        except Exception as e:
+            logger.error(f"[StaticCrawler] Request Failed: {url}, Error: {e}")
+            return
+
+        soup = BeautifulSoup(text, 'html.parser')
+        forms, independent_inputs = self.extract_forms(soup, url)
+        result = {
+            'url': url, 'forms': forms, 'independent_inputs': independent_inputs,
+            'depth': depth, 'js_driven': looks_js_driven(soup, text), **validators
+        }
+        self.extraction_results.append(result)
+        for link in soup.find_all('a', href=True):
+            new_url = self.normalize(urljoin(url, link['href']))
+            if new_url not in self.seen and self.is_valid_url(new_url):
+                self.enqueue(new_url, depth + 1)
+        return result
+
+    async def worker(self, session):
+        while True:
+            url, depth = await self.frontier.get()
+            try:
+                await self.fetch(session, url, depth)
+            finally:
+                self.frontier.task_done()
+
+    async def crawl_async(self):
+        self.frontier = asyncio.Queue()
+        if not self.restore():
+            self.seed()
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            workers = [asyncio.create_task(self.worker(session)) for _ in range(self.concurrency)]
+            try:
+                await self.frontier.join()
+            finally:
+                for w in workers:
+                    w.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        return self.extraction_results
+
+    def seed(self):
+        self.enqueue(self.base_url, 0)
+
+    def restore(self):
+        if not self.checkpoint:
+            return False
+        seen, visited, pages = self.checkpoint.crawl_state()
+        if not seen:
+            return False
+        self.seen = set(seen)
+        self.visited = visited
+        self.extraction_results = pages
+        for url, depth in seen.items():
+            if url not in visited:
+                self.frontier.put_nowait((url, depth))
+        logger.info(f"[StaticCrawler] Resumed: {len(visited)} pages done, {self.frontier.qsize()} left in frontier")
+        return True
+
+    def crawl(self):
+        return asyncio.run(self.crawl_async())
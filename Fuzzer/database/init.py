@@ -1,31 +1,10 @@
-import sqlite3
+import os
+import sys
 
-conn = sqlite3.connect("webfuzzer.db")
-cur = conn.cursor()
+# python database/init.py 로 직접 실행해도 프로젝트 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-cur.executescript("""
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT NOT NULL UNIQUE,
-    password TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-            
-CREATE TABLE results (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER,
-    target_url TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    vuln_count INTEGER,
-    report_path TEXT,
-    log_path TEXT,
-    visibility TEXT DEFAULT 'link',
-    result_hash TEXT UNIQUE,
-    FOREIGN KEY(user_id) REFERENCES users(id)
-);
-""")
+from database.schema import SCHEMA_VERSION, init_db
 
-conn.commit()
-conn.close()
-print("✅ DB 초기화 완료")
\ No newline at end of file
+init_db("webfuzzer.db")
+print(f"✅ DB 초기화 완료 (schema v{SCHEMA_VERSION})")
@@ -0,0 +1,64 @@
+import queue
+import sqlite3
+
+from database.schema import DEFAULT_DB_PATH, connect, init_db
+
+
+class PooledConnection:
+    # sqlite3.Connection처럼 쓰되 close()하면 실제로 닫지 않고 풀에 반환
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a connection returned to the pool.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def __del__(self):
+        # close()를 빠뜨린 경우에도 연결이 새지 않도록
+        self.close()
+
+
+class ConnectionPool:
+    # 요청마다 sqlite3.connect + PRAGMA를 반복하지 않도록 연결을 재사용. 풀이 비면 새로 열고, 가득 차면 닫음
+    def __init__(self, db_path=DEFAULT_DB_PATH, size=8, row_factory=sqlite3.Row):
+        self.db_path = db_path
+        self.row_factory = row_factory
+        self.idle = queue.LifoQueue(maxsize=size)
+        init_db(db_path)
+
+    def acquire(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = connect(self.db_path)
+            conn.row_factory = self.row_factory
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        # 커밋하지 않은 변경은 다음 사용자에게 넘기지 않음
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self.idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
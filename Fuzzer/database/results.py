@@ -0,0 +1,121 @@
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# API 필터 이름 → attempts 컬럼
+ATTEMPT_FILTERS = {
+    'category': 'category',
+    'result': 'response',
+    'status': 'status',
+    'parameter': 'parameter',
+}
+VULNERABILITY_FILTERS = {
+    'type': 'type',
+    'form': 'form',
+    'parameter': 'parameter',
+}
+
+# 요약에서 값이 없는(NULL/빈 문자열) 행에 붙이는 이름 → 필터로 다시 들어오면 그 값 그대로인 행
+# (타임아웃/실패 시도는 status에 'N/A'를 직접 기록)과 값이 없는 행을 함께 조회
+EMPTY_LABELS = {
+    'category': 'unknown',
+    'status': 'N/A',
+}
+
+ATTEMPT_COLUMNS = ('id', 'form', 'payload', 'category', 'response', 'is_successful', 'status', 'elapsed', 'parameter')
+VULNERABILITY_COLUMNS = ('id', 'form', 'type', 'payload', 'confidence', 'evidence', 'response_code', 'signature',
+                         'parameter')
+
+
+def page_size(raw):
+    try:
+        size = int(raw)
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def parse_after(raw):
+    # 잘못된 커서는 호출 측에서 400으로 응답하도록 ValueError
+    if raw in (None, ''):
+        return None
+    after = int(raw)
+    if after < 0:
+        raise ValueError(f"Invalid cursor: {raw}")
+    return after
+
+
+def keyset_page(db, table, columns, result_id, after=None, limit=PAGE_SIZE, filters=None):
+    # OFFSET 대신 마지막으로 받은 id 이후를 조회 → 페이지가 뒤로 가도 (result_id, id) 인덱스로 바로 찾음
+    where, params = ["result_id = ?"], [result_id]
+    if after is not None:
+        where.append("id > ?")
+        params.append(after)
+    for column, value in (filters or {}).items():
+        if EMPTY_LABELS.get(column) == value:
+            where.append(f"({column} = ? OR {column} IS NULL OR {column} = '')")
+            params.append(value)
+            continue
+        where.append(f"{column} = ?")
+        params.append(value)
+    params.append(limit + 1)
+    rows = db.execute(f"""
+        SELECT {', '.join(columns)} FROM {table}
+        WHERE {' AND '.join(where)}
+        ORDER BY id LIMIT ?
+    """, params).fetchall()
+    items = [dict(zip(columns, row)) for row in rows[:limit]]
+    # 한 건을 더 읽어서 다음 페이지가 있는지 확인
+    next_after = items[-1]['id'] if len(rows) > limit else None
+    return {'items': items, 'next': next_after}
+
+
+def pick_filters(args, allowed):
+    return {column: args[name] for name, column in allowed.items() if args.get(name) not in (None, '')}
+
+
+def attempts_page(db, result_id, args):
+    filters = pick_filters(args, ATTEMPT_FILTERS)
+    if args.get('successful') in ('0', '1'):
+        filters['is_successful'] = int(args['successful'])
+    return keyset_page(db, 'attempts', ATTEMPT_COLUMNS, result_id, parse_after(args.get('after')),
+                       page_size(args.get('limit')), filters)
+
+
+def vulnerabilities_page(db, result_id, args):
+    return keyset_page(db, 'vulnerabilities', VULNERABILITY_COLUMNS, result_id, parse_after(args.get('after')),
+                       page_size(args.get('limit')), pick_filters(args, VULNERABILITY_FILTERS))
+
+
+def result_summary(db, result_id):
+    # 차트/통계에 필요한 집계만 DB에서 계산해서 반환 (행 전체를 클라이언트로 보내지 않음)
+    vuln_counts = dict(db.execute(
+        "SELECT type, COUNT(*) FROM vulnerabilities WHERE result_id = ? GROUP BY type ORDER BY COUNT(*) DESC",
+        (result_id,)).fetchall())
+    page_counts = dict(db.execute(
+        "SELECT form, COUNT(*) FROM vulnerabilities WHERE result_id = ? GROUP BY form ORDER BY COUNT(*) DESC",
+        (result_id,)).fetchall())
+    by_category, by_result, by_status = {}, {}, {}
+    attempt_count = successful = 0
+    for category, response, status, is_successful, count in db.execute("""
+        SELECT category, response, status, is_successful, COUNT(*) FROM attempts
+        WHERE result_id = ? GROUP BY category, response, status, is_successful
+    """, (result_id,)):
+        attempt_count += count
+        successful += count if is_successful else 0
+        category = category or EMPTY_LABELS['category']
+        status = status or EMPTY_LABELS['status']
+        by_category[category] = by_category.get(category, 0) + count
+        by_result[response] = by_result.get(response, 0) + count
+        by_status[status] = by_status.get(status, 0) + count
+    vuln_total = sum(vuln_counts.values())
+    return {
+        'vulnCounts': vuln_counts,
+        'pageCounts': page_counts,
+        'attempts': attempt_count,
+        'successfulAttempts': successful,
+        'vulnerabilities': vuln_total,
+        'successRate': round(vuln_total * 100 / attempt_count, 1) if attempt_count else 0.0,
+        'byCategory': by_category,
+        'byResult': by_result,
+        'byStatus': by_status,
+    }
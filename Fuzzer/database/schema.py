@@ -0,0 +1,177 @@
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "webfuzzer.db"
+
+
+def ensure_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def add_finding_columns(conn):
+    # 예전에는 SQLiteSink가 열 때마다 추가하던 컬럼 (이미 있는 DB도 있으므로 없는 것만 추가)
+    ensure_columns(conn, 'attempts', [
+        ('category', 'TEXT'), ('status', 'TEXT'), ('elapsed', 'REAL'), ('parameter', 'TEXT')
+    ])
+    ensure_columns(conn, 'vulnerabilities', [
+        ('confidence', 'INTEGER'), ('evidence', 'TEXT'), ('response_code', 'TEXT'), ('signature', 'TEXT'),
+        ('parameter', 'TEXT')
+    ])
+
+
+def add_job_columns(conn):
+    # 분산 워커가 기록한 행의 (작업 id, 실행 번호) — 재시도된 작업의 이전 실행 행을 지울 때 사용
+    for table in ('attempts', 'vulnerabilities'):
+        ensure_columns(conn, table, [('job', 'TEXT'), ('job_attempt', 'INTEGER')])
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_result_job ON {table} (result_id, job)")
+
+
+# (버전, 설명, SQL 또는 conn을 받는 함수). 적용된 버전은 PRAGMA user_version에 기록
+# 새 변경은 항상 맨 뒤에 새 버전으로 추가 (이미 배포된 항목은 수정하지 않음)
+MIGRATIONS = [
+    (1, "users, results", """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            target_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            vuln_count INTEGER,
+            report_path TEXT,
+            log_path TEXT,
+            visibility TEXT DEFAULT 'link',
+            result_hash TEXT UNIQUE,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );
+    """),
+    (2, "attempts, vulnerabilities", """
+        CREATE TABLE IF NOT EXISTS attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER,
+            form TEXT,
+            payload TEXT,
+            response TEXT,
+            is_successful BOOLEAN,
+            FOREIGN KEY (result_id) REFERENCES results(id)
+        );
+        CREATE TABLE IF NOT EXISTS vulnerabilities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER,
+            form TEXT,
+            type TEXT,
+            payload TEXT,
+            FOREIGN KEY (result_id) REFERENCES results(id)
+        );
+    """),
+    (3, "finding detail columns", add_finding_columns),
+    (4, "crawl_pages", """
+        CREATE TABLE IF NOT EXISTS crawl_pages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER,
+            url TEXT,
+            page TEXT,
+            FOREIGN KEY (result_id) REFERENCES results(id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_crawl_pages_result_id ON crawl_pages (result_id);
+    """),
+    (5, "scan_jobs", """
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            scan TEXT NOT NULL,
+            parent INTEGER,
+            payload TEXT,
+            status TEXT DEFAULT 'queued',
+            worker TEXT,
+            lease_until REAL,
+            attempts INTEGER DEFAULT 0,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status, id);
+        CREATE INDEX IF NOT EXISTS idx_scan_jobs_scan ON scan_jobs (scan);
+        CREATE INDEX IF NOT EXISTS idx_scan_jobs_parent ON scan_jobs (parent);
+    """),
+    (6, "lookup indexes", """
+        CREATE INDEX IF NOT EXISTS idx_results_user_id ON results (user_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_results_result_hash ON results (result_hash);
+        CREATE INDEX IF NOT EXISTS idx_results_target_url ON results (target_url, id);
+        CREATE INDEX IF NOT EXISTS idx_attempts_result_id ON attempts (result_id, id);
+        CREATE INDEX IF NOT EXISTS idx_vulnerabilities_result_id ON vulnerabilities (result_id, id);
+    """),
+    (7, "result page filter indexes", """
+        CREATE INDEX IF NOT EXISTS idx_attempts_result_category ON attempts (result_id, category, id);
+        CREATE INDEX IF NOT EXISTS idx_attempts_result_successful ON attempts (result_id, is_successful, id);
+    """),
+    (8, "job columns on result rows", add_job_columns),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def connect(db_path=DEFAULT_DB_PATH, **kwargs):
+    # 웹 앱, 스캔 스레드, 워커가 같은 파일을 동시에 쓰므로 WAL + 넉넉한 busy timeout
+    kwargs.setdefault('timeout', 30)
+    kwargs.setdefault('check_same_thread', False)
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def migrate(conn):
+    # 여러 프로세스가 동시에 시작해도 BEGIN IMMEDIATE로 한 번씩만 적용
+    applied = []
+    for version, description, migration in MIGRATIONS:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version <= current:
+                conn.execute("ROLLBACK")
+                continue
+            if callable(migration):
+                migration(conn)
+            else:
+                for statement in migration.split(';'):
+                    if statement.strip():
+                        conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        applied.append(version)
+        logger.info(f"[Schema] Applied migration {version}: {description}")
+    return applied
+
+
+migrated = set()
+migrate_lock = threading.Lock()
+
+
+def init_db(db_path=DEFAULT_DB_PATH):
+    # 프로세스마다 DB 파일별로 한 번만 마이그레이션
+    with migrate_lock:
+        if db_path in migrated:
+            return
+        conn = connect(db_path, isolation_level=None)
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
+        migrated.add(db_path)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fuzzing.detectors import init_worker, analyze_in_worker, call_in_worker, baseline_file
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_MODES = ('process', 'thread', 'inline')
+
+
+def write_baseline(path, baseline):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, default=str)
+
+
+class AnalysisStage:
+    # 네트워크 단계 → (bounded queue) → 분석 워커 풀 → handler 로 결과 기록
+    def __init__(self, detector, handler, mode='process', workers=None, queue_size=None,
+                 similarity_mode='exact', dom_text=False):
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        self.detector = detector
+        self.handler = handler
+        self.mode = mode
+        self.workers = workers or 2
+        self.queue = asyncio.Queue(maxsize=queue_size or self.workers * 8)
+        self.similarity_mode = similarity_mode
+        self.dom_text = dom_text
+        self.executor = None
+        self.tasks = []
+        # process 모드: baseline 본문은 작업마다 피클링하지 않고 파일로 한 번만 써 두고 키만 전달
+        # (워커는 처음 본 키만 파일에서 읽어 캐시). id(baseline) → (키, baseline, 파일 쓰기 future)
+        self.baseline_dir = None
+        self.baseline_keys = {}
+
+    def start(self):
+        if self.mode == 'process':
+            self.baseline_dir = tempfile.mkdtemp(prefix='wf-baselines-')
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.detector.base_url, self.similarity_mode, self.dom_text, self.baseline_dir)
+            )
+        elif self.mode == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.tasks = [asyncio.create_task(self.consume()) for _ in range(self.workers)]
+
+    async def submit(self, context, job):
+        # 큐가 가득 차면 네트워크 워커가 여기서 대기 (backpressure)
+        await self.queue.put((context, job))
+
+    async def baseline_key(self, baseline):
+        entry = self.baseline_keys.get(id(baseline))
+        if entry is None:
+            # baseline 객체는 캐시에 스캔 내내 남아 있지만, id 재사용을 막기 위해 참조도 함께 보관
+            # 파일 쓰기는 루프 밖(기본 스레드 풀)에서. 같은 baseline을 동시에 기다리는 작업은 같은 future를 기다림
+            key = uuid.uuid4().hex
+            written = asyncio.get_running_loop().run_in_executor(
+                None, write_baseline, baseline_file(self.baseline_dir, key), baseline)
+            entry = (key, baseline, written)
+            self.baseline_keys[id(baseline)] = entry
+        await asyncio.shield(entry[2])
+        return entry[0]
+
+    async def remote_job(self, job):
+        category, body, encoding, payload, baseline = job[:5]
+        key = await self.baseline_key(baseline) if baseline else None
+        return (category, body, encoding, payload, key) + tuple(job[5:])
+
+    async def run_job(self, job):
+        if self.mode == 'inline':
+            return self.detector.analyze(*job)
+        loop = asyncio.get_running_loop()
+        if self.mode == 'thread':
+            return await loop.run_in_executor(self.executor, self.detector.analyze, *job)
+        try:
+            return await loop.run_in_executor(self.executor, analyze_in_worker, *(await self.remote_job(job)))
+        except BrokenProcessPool:
+            self.use_threads()
+            return await loop.run_in_executor(self.executor, self.detector.analyze, *job)
+
+    async def run_with_detector(self, fn, baseline, *args):
+        # fn(detector, baseline, *args)를 분석 풀에서 실행. process 모드는 워커의 detector와 baseline 캐시를 사용
+        # (fn은 피클링할 수 있도록 모듈 수준 함수여야 함)
+        if self.mode == 'inline':
+            return fn(self.detector, baseline, *args)
+        loop = asyncio.get_running_loop()
+        if self.mode == 'process':
+            key = await self.baseline_key(baseline) if baseline else None
+            try:
+                return await loop.run_in_executor(self.executor, call_in_worker, fn, key, *args)
+            except BrokenProcessPool:
+                self.use_threads()
+        return await loop.run_in_executor(self.executor, fn, self.detector, baseline, *args)
+
+    def use_threads(self):
+        # 여러 작업이 동시에 BrokenProcessPool을 받아도 전환은 한 번만
+        if self.mode != 'process':
+            return
+        logger.warning("[Analysis] Process pool broken, falling back to thread pool")
+        broken, self.executor = self.executor, ThreadPoolExecutor(max_workers=self.workers)
+        self.mode = 'thread'
+        if broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run_blocking(self, fn, *args):
+        # 분석 외의 CPU 작업(baseline 병합 등)도 루프 밖의 같은 풀에서. start() 전이면 루프 기본 스레드 풀
+        if self.mode == 'inline':
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        except BrokenProcessPool:
+            self.use_threads()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def consume(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            context, job = item
+            try:
+                found, evidence, signature, evidence_class = await self.run_job(job)
+                await self.handler(context, found, evidence, signature, evidence_class)
+            except Exception as e:
+                logger.error(f"[Analysis] Detector failed: {repr(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def drain(self):
+        await self.queue.join()
+
+    async def close(self):
+        await self.queue.join()
+        for _ in self.tasks:
+            await self.queue.put(None)
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.baseline_dir:
+            shutil.rmtree(self.baseline_dir, ignore_errors=True)
+            self.baseline_dir = None
+        self.baseline_keys = {}
@@ -2,13 +2,24 @@ import aiohttp
 import asyncio
 import json
 import os
-import html
 import re
 import time
 from lxml import html as lxml_html
 from urllib.parse import urljoin, urlparse
 import logging
-from bs4 import BeautifulSoup
+from fuzzing.scheduler import FuzzScheduler
+from fuzzing.rate_limiter import AdaptiveRateLimiter
+from fuzzing.coverage import CoverageCollector
+from fuzzing.similarity import SimilarityEngine
+from fuzzing.detectors import ResponseDetector, EVIDENCE_SCORES
+from fuzzing.analysis import AnalysisStage
+from fuzzing.baseline import BaselineCache
+from fuzzing.result_sink import MemorySink
+from fuzzing.placement import PLACEMENT_MODES, build_data, placements, estimate_all_modes
+from fuzzing.probe import ProbeScreen
+from fuzzing.mutation import MutationEngine
+from fuzzing.bandit import BANDIT_POLICIES, Bandit
+from fuzzing.budget import ScanBudget
 
 logger = logging.getLogger(__name__)
 
@@ -69,22 +80,6 @@ async def login_to_dvwa(session, base_url, username="admin", password="password"
         logger.error(f"[Login] Exception: {repr(e)}")
         return False
 
-def levenshtein_distance(s1, s2):
-    if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
-    if len(s2) == 0:
-        return len(s1)
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
-    return previous_row[-1]
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -95,16 +90,65 @@ def get_absolute_action_url(base_url, action):
         return action
     return urljoin(base_url, action)
 
+COVERAGE_REWARD = 0.5
+PAYLOAD_ORDERS = ('corpus', 'bandit')
+
+# CLI/웹 폼/작업 payload로 고를 수 있는 퍼징 옵션: 선택형은 허용 값 목록, 나머지는 켜기/끄기
+FUZZ_OPTION_CHOICES = {
+    'placement': PLACEMENT_MODES,
+    'payload_order': PAYLOAD_ORDERS,
+    'bandit_policy': BANDIT_POLICIES,
+}
+FUZZ_OPTION_FLAGS = ('fuzz_hidden', 'two_phase', 'mutate')
+FUZZ_OPTION_FIELDS = tuple(FUZZ_OPTION_CHOICES) + FUZZ_OPTION_FLAGS
+
+
+def fuzz_options_from(options):
+    # 폼/CLI 입력(문자열 허용)을 AsyncFuzzer 키워드 인자로 변환. 비어 있는 값은 기본값 유지
+    fuzz_options = {}
+    for field, choices in FUZZ_OPTION_CHOICES.items():
+        value = options.get(field)
+        if value in (None, ''):
+            continue
+        if value not in choices:
+            raise ValueError(f"Unknown {field}: {value}")
+        fuzz_options[field] = value
+    for field in FUZZ_OPTION_FLAGS:
+        value = options.get(field)
+        if value not in (None, ''):
+            fuzz_options[field] = str(value).lower() in ('1', 'true', 'on', 'y', 'yes')
+    return fuzz_options
+
+
 class AdaptivePayloadGenerator:
-    def __init__(self, initial_payloads):
+    def __init__(self, initial_payloads, policy='ucb'):
         self.payloads = initial_payloads
         self.success_rate = {payload: 0 for category in initial_payloads.values() for payload in category}
+        self.bandit = Bandit(policy)
 
     def update_success(self, payload, detected):
         self.success_rate[payload] = self.success_rate.get(payload, 0) * 0.9 + (100 if detected else 0)
+        self.bandit.reward(payload, 1.0 if detected else 0.0)
+
+    def update_coverage(self, payloads):
+        # 새 경로를 연 배치의 페이로드들이 보상을 나눠 가짐 (탐지보다 약한 신호)
+        payloads = set(payloads)
+        for payload in payloads:
+            self.success_rate[payload] = self.success_rate.get(payload, 0) * 0.9 + 100 / len(payloads)
+            self.bandit.reward(payload, COVERAGE_REWARD / len(payloads))
+
+    def update_operator(self, category, operator, detected):
+        self.bandit.reward(('op', category, operator), 1.0 if detected else 0.0)
 
-    def get_priority_payloads(self):
-        return sorted(self.success_rate.keys(), key=lambda p: self.success_rate.get(p, 0), reverse=True)[:50]
+    def next_payload(self, candidates):
+        return self.bandit.select(candidates)
+
+    def next_operator(self, category, operators):
+        return self.bandit.select([('op', category, op) for op in operators])[2]
+
+    def get_priority_payloads(self, category=None):
+        payloads = self.payloads.get(category, []) if category else self.success_rate.keys()
+        return sorted(payloads, key=lambda p: self.success_rate.get(p, 0), reverse=True)[:50]
 
 class CoverageTracker:
     def __init__(self):
@@ -116,17 +160,79 @@ class CoverageTracker:
         return len(new_paths)
 
 class AsyncFuzzer:
-    def __init__(self, forms, selected_categories, payload_path='payloads.json', concurrency=3, base_url=None):
+    def __init__(self, forms, selected_categories, payload_path='payloads.json', concurrency=3, base_url=None,
+                 per_host_concurrency=None, queue_size=None, rate_mode='adaptive', request_delay=0.2,
+                 coverage_mode='batched', coverage_every=20, coverage_interval=5.0,
+                 similarity_mode='exact', dom_diff=False,
+                 analysis_mode='process', analysis_workers=None, analysis_queue_size=None,
+                 baseline_samples=3, baseline_failure_ttl=60.0, sink=None, placement='all_at_once',
+                 fuzz_hidden=False, two_phase=False, mutate=False, mutant_budget=10, mutation_seeds=3,
+                 payload_order='corpus', bandit_policy='ucb', budget=None, checkpoint=None, progress=None):
         self.forms = forms
         self.concurrency = concurrency
-        self.vulnerabilities = []
-        self.attempts = []
+        self.per_host_concurrency = per_host_concurrency or concurrency
+        self.queue_size = queue_size
+        # 'adaptive': 호스트별 AIMD 토큰 버킷, 'fixed': 요청마다 request_delay 만큼 대기
+        self.rate_mode = rate_mode
+        self.request_delay = request_delay
+        self.rate_limiter = AdaptiveRateLimiter() if rate_mode == 'adaptive' else None
+        # 시도/취약점은 sink로 바로 흘려보내고 메모리에는 집계만 유지 (기본값은 메모리 리스트)
+        self.sink = sink or MemorySink()
+        if placement not in PLACEMENT_MODES:
+            raise ValueError(f"Unknown placement mode: {placement}")
+        self.placement = placement
+        # hidden 필드(토큰처럼 보이는 이름 제외)에도 페이로드를 넣을지 — 기본은 CSRF 토큰 보존을 위해 제외
+        self.fuzz_hidden = fuzz_hidden
+        # 1단계 카나리 프로브에 반응한 파라미터에만 전체 페이로드 전송
+        self.two_phase = two_phase
+        self.probe_screen = None
+        # 본 라운드에서 탐지되지 않은 파라미터에 상위 점수 시드의 변이를 예산 내에서 전송
+        self.mutate = mutate
+        self.mutation_seeds = mutation_seeds
+        self.mutator = MutationEngine(budget_per_parameter=mutant_budget)
+        self.found_keys = set()
         self.payloads = self.load_selected_payloads(payload_path, selected_categories)
-        self.payload_generator = AdaptivePayloadGenerator(self.payloads)
+        # 'bandit': 엔드포인트마다 다음 페이로드를 밴딧이 선택
+        if payload_order not in PAYLOAD_ORDERS:
+            raise ValueError(f"Unknown payload order: {payload_order}")
+        self.payload_order = payload_order
+        self.payload_generator = AdaptivePayloadGenerator(self.payloads, bandit_policy)
+        # 요청 수/시간/엔드포인트별 한도, 확인된 lane 조기 종료
+        self.budget = budget or ScanBudget()
+        # 완료된 (엔드포인트, 카테고리, 페이로드, 파라미터)를 기록 → 재개 시 다시 보내지 않음
+        self.checkpoint = checkpoint
+        # 요청/탐지 이벤트를 웹 UI 진행 상황으로 전달 (utils.progress.ScanProgress)
+        self.progress = progress
         self.coverage_tracker = CoverageTracker()
-        self.current_max_coverage = 0
-        self.baselines = {}
         self.base_url = base_url
+        self.detector = ResponseDetector(base_url, SimilarityEngine(mode=similarity_mode, dom_text=dom_diff))
+        self.analysis = AnalysisStage(
+            self.detector,
+            self.record_result,
+            mode=analysis_mode,
+            workers=analysis_workers or min(4, os.cpu_count() or 1),
+            queue_size=analysis_queue_size,
+            similarity_mode=similarity_mode,
+            dom_text=dom_diff
+        )
+        self.baselines = BaselineCache(self.establish_baseline, samples=baseline_samples, failure_ttl=baseline_failure_ttl,
+                                       run_blocking=self.analysis.run_blocking)
+        self.coverage = CoverageCollector(
+            f"{base_url.rstrip('/')}/coverage.php" if base_url else None,
+            self.coverage_tracker,
+            self.payload_generator,
+            mode=coverage_mode,
+            every=coverage_every,
+            interval=coverage_interval
+        )
+
+    @property
+    def attempts(self):
+        return self.sink.attempts
+
+    @property
+    def vulnerabilities(self):
+        return self.sink.vulnerabilities
 
     def load_selected_payloads(self, path, selected_categories):
         if os.path.exists(path):
@@ -139,210 +245,114 @@ class AsyncFuzzer:
             logger.error(f"payloads.json not found: {path}")
             return {}
 
-    async def get_code_coverage(self, session):
-        try:
-            coverage_url = f"{self.base_url.rstrip('/')}/coverage.php"
-            async with session.get(coverage_url) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-        except Exception as e:
-            logger.error(f"Failed to get coverage data: {e}")
-        return []
-
-    async def prioritize_payload(self, payload):
-        self.payload_generator.update_success(payload, True)
-
     async def establish_baseline(self, session, form):
+        # baseline 샘플도 퍼징 요청과 같은 rate limiter/예산을 거침 (예산이 없으면 None)
         if not any(i.get('name') for i in form['inputs']):
             logger.warning("No input fields → skipping baseline")
-            return
+            return None
 
         benign_data = {
             i['name']: "SAFE_VALUE"
             for i in form['inputs'] if i.get('name')
         }
 
-        if not benign_data:
-            logger.warning("benign_data is empty → skipping")
-            return
-
         action = get_absolute_action_url(self.base_url, form.get('action', ''))
         parsed = urlparse(action)
 
         if not parsed.scheme.startswith('http'):
             logger.warning(f"Invalid action URL: {action}, skipping")
-            return
-
-        try:
-            async with session.post(action, data=benign_data, timeout=20) as resp:
-                content = await resp.text()
-                return {
-                    'status': resp.status,
-                    'length': len(content),
-                    'content': content,
-                    'elapsed': float(resp.headers.get('X-Response-Time', 0) or 0)
-                }
-        except Exception as e:
-            logger.error(f"[Baseline request failed] URL: {action}, data: {benign_data}, reason: {repr(e)}")
             return None
-
-    def content_differ(self, text1, text2, threshold=0.2):
-        if not text1 or not text2:
-            return False
-        dist = levenshtein_distance(text1, text2)
-        max_len = max(len(text1), len(text2))
-        return (dist / max_len) > threshold
-
-    # --- Vulnerability detection logic ---
-    def detect_sqli(self, text, payload, baseline, status, elapsed):
-        error_patterns = [
-            r"you have an error in your sql syntax", r"unclosed quotation mark", r"warning.*mysql",
-            r"pg_query\(\):", r"ORA-\d+", r"syntax error.*sql", r"unexpected end of SQL command"
-        ]
-        if any(re.search(p, text, re.IGNORECASE) for p in error_patterns):
-            return "SQL Injection"
-        if baseline and (status != baseline['status'] or self.content_differ(text, baseline['content'])):
-            return "SQL Injection (Differential)"
-        if 'sleep' in payload.lower() and baseline and elapsed > baseline.get('elapsed', 0) + 4:
-            return "Blind SQL Injection (Time-Based)"
-        return None
-
-    def detect_xss(self, text, payload, baseline):
-        if not text or not payload:
+        if not self.budget.acquire(action):
             return None
 
-        if payload in text:
-            try:
-                soup = BeautifulSoup(text, 'html.parser')
-                for script in soup.find_all("script"):
-                    if payload in script.decode_contents():
-                        return "XSS (script block)"
-                for tag in soup.find_all(True):
-                    for attr_key, attr_val in tag.attrs.items():
-                        if isinstance(attr_val, str) and payload in attr_val:
-                            return "XSS (attribute injection)"
-                        elif isinstance(attr_val, list) and any(payload in v for v in attr_val):
-                            return "XSS (attribute list injection)"
-                if any(payload in str(tag) for tag in soup.find_all()):
-                    return "XSS (HTML tag injection)"
-            except Exception as e:
-                logger.warning(f"[XSS Parser] Parsing Failed: BeautifulSoup : {e}")
-
-        if html.escape(payload) in text and baseline and self.content_differ(text, baseline['content']):
-            return "XSS (encoded context)"
-
-        if baseline and self.content_differ(text, baseline['content']):
-            snippet = text[max(0, text.find(payload) - 30):text.find(payload) + 50]
-            if any(x in snippet for x in ['<script', 'onerror=', 'alert(', '<svg', 'onload=']):
-                return "XSS (pattern-based heuristic)"
-        return None
-
-    def detect_command_injection(self, text, payload, baseline, elapsed):
-        command_indicators = [
-            "Directory of", "bytes free", "Volume Serial Number",
-            "root:x:0:0", "drwxr-xr-x", "total [0-9]+"
-        ]
-        if any(re.search(p, text) for p in command_indicators):
-            return "Command Injection"
-        if ('sleep' in payload or 'ping' in payload) and baseline and elapsed > baseline.get('elapsed', 0) + 3:
-            return "Command Injection (Time-Based)"
-        if baseline and self.content_differ(text, baseline['content']):
-            return "Command Injection (Differential)"
-        return None
-
-    def detect_path_traversal(self, text, payload, baseline):
-        if "root:x" in text and baseline and self.content_differ(text, baseline['content']):
-            return "Path Traversal"
-        return None
-
-    def detect_ssti(self, text, payload):
-        if "{{49}}" in text or "${49}" in text or "49" in text:
-            return "SSTI"
-        return None
-
-    def detect_open_redirect(self, text, payload, status, resp_headers):
-        location = resp_headers.get('Location', '')
-        if status in [301, 302, 303, 307, 308] and location and not location.startswith(self.base_url):
-            return "Open Redirect"
-        return None
-
-    def detect_csrf(self, text, payload, baseline):
-        if baseline and self.content_differ(text, baseline['content']):
-            if any(k in text.lower() for k in ['csrf', 'token missing', 'unauthorized']):
-                return "CSRF"
-        return None
+        status, headers, body, encoding, elapsed = await self.send_request(
+            session, form.get('method', 'post').lower(), action, benign_data)
+        content = body.decode(encoding or 'utf-8', errors='replace')
+        return {
+            'status': status,
+            'length': len(content),
+            'content': content,
+            'elapsed': elapsed
+        }
 
     def calculate_confidence(self, score, response_time):
         time_factor = min(1.0, response_time / 5.0)
         return min(100, int(score * (1 + 0.3 * time_factor)))
 
-    def extract_evidence(self, text, payload):
-        idx = text.find(payload)
-        if idx == -1:
-            return text[:200]
-        start = max(0, idx - 50)
-        end = min(len(text), idx + 50)
-        return text[start:end]
-
-    async def analyze_response(self, text, payload, form, status, category, elapsed, session, resp_headers):
+    async def analyze_response(self, body, payload, form, status, category, elapsed, session, resp_headers,
+                               encoding='utf-8', baseline=None, parameter=None, origin=None):
         action = get_absolute_action_url(self.base_url, form.get('action', ''))
-        baseline = self.baselines.get(action)
-        found = None
-
-        coverage_data = await self.get_code_coverage(session)
-        new_coverage = self.coverage_tracker.update(coverage_data)
-        if new_coverage > self.current_max_coverage:
-            self.current_max_coverage = new_coverage
-            await self.prioritize_payload(payload)
-
-        if category == 'sql_injection':
-            found = self.detect_sqli(text, payload, baseline, status, elapsed)
-        elif category == 'xss':
-            found = self.detect_xss(text, payload, baseline)
-        elif category == 'command_injection':
-            found = self.detect_command_injection(text, payload, baseline, elapsed)
-        elif category == 'path_traversal':
-            found = self.detect_path_traversal(text, payload, baseline)
-        elif category == 'ssti':
-            found = self.detect_ssti(text, payload)
-        elif category == 'open_redirect':
-            found = self.detect_open_redirect(text, payload, status, resp_headers)
-        elif category == 'csrf':
-            found = self.detect_csrf(text, payload, baseline)
 
+        await self.coverage.record(session, payload)
+
+        context = {'action': action, 'payload': payload, 'category': category, 'status': status,
+                   'elapsed': elapsed, 'parameter': parameter, 'origin': origin}
+        job = (category, body, encoding, payload, baseline, status, elapsed, resp_headers.get('Location', ''))
+        await self.analysis.submit(context, job)
+
+    async def record_result(self, context, found, evidence, signature=None, evidence_class=None):
+        action, payload, status = context['action'], context['payload'], context['status']
+        elapsed = context['elapsed']
         result = found or 'No vulnerability detected'
-        confidence = self.calculate_confidence(100, elapsed) if found else 0
-        evidence = self.extract_evidence(text, payload) if found else ""
-        self.attempts.append({
+        # 신뢰도는 탐지 근거(시그니처 > 상태 코드 변화 > 본문 차이 등)에 따라 다름
+        confidence = self.calculate_confidence(EVIDENCE_SCORES[evidence_class or 'diff'], elapsed) if found else 0
+        # 변이는 시드 페이로드와 사용한 연산자 양쪽에 보상
+        seed, operator = context.get('origin') or (payload, None)
+        self.payload_generator.update_success(seed, bool(found))
+        if operator:
+            self.payload_generator.update_operator(context['category'], operator, bool(found))
+        if found:
+            self.found_keys.add((action, context.get('parameter'), context['category']))
+            self.budget.record_finding(action, context['category'], confidence, conclusive=evidence_class == 'signature')
+            if self.progress:
+                self.progress.emit('finding', type=found, action=action, parameter=context.get('parameter'),
+                                   category=context['category'], payload=payload, confidence=confidence)
+        self.sink.add_attempt({
             'form_action': action,
             'payload': payload,
-            'category': category,
+            'category': context['category'],
             'result': result,
             'status': status,
-            'elapsed': round(elapsed, 2)
+            'elapsed': round(elapsed, 2),
+            'parameter': context.get('parameter')
         })
-
         if found:
-            self.vulnerabilities.append({
+            self.sink.add_vulnerability({
                 'type': found,
                 'confidence': confidence,
                 'evidence': evidence,
                 'payload': payload,
                 'form': action,
-                'response_code': status
+                'response_code': status,
+                'signature': signature,
+                'parameter': context.get('parameter')
             })
         elif confidence < 50 and found:
-            self.vulnerabilities.append({
+            self.sink.add_vulnerability({
                 'type': "Manual verification required",
                 'confidence': confidence,
                 'evidence': evidence,
                 'payload': payload,
                 'form': action,
-                'response_code': status
+                'response_code': status,
+                'parameter': context.get('parameter')
             })
 
-    async def fuzz_form(self, session, form, payload, category):
-        data = {i['name']: (payload if i.get('type') == 'text' else 'test') for i in form['inputs'] if i.get('name')}
+        # 시도와 취약점이 모두 sink에 들어간 뒤에만 완료로 표시 (배치가 차면 DB에 먼저 기록한 뒤 체크포인트 기록)
+        if self.checkpoint and self.checkpoint.record_done(action, context['category'], payload, context.get('parameter')):
+            self.flush_checkpoint()
+
+    def flush_checkpoint(self):
+        self.sink.flush()
+        # 재개해도 요청 수/소요 시간 한도가 처음부터 다시 시작하지 않도록 함께 저장
+        self.checkpoint.save_budget(self.budget.state())
+        self.checkpoint.flush()
+
+    async def fuzz_form(self, session, form, payload, category, targets=None, origin=None):
+        if targets is None:
+            targets = next(iter(placements(form, 'all_at_once', self.fuzz_hidden)), ())
+        data = build_data(form, payload, targets)
+        parameter = ','.join(targets)
         method = form.get('method', 'get').lower()
         action = get_absolute_action_url(self.base_url, form.get('action', ''))
         logger.info(f"[AsyncFuzzer] Request action URL: {action}")
@@ -351,48 +361,179 @@ class AsyncFuzzer:
         if not parsed.scheme.startswith('http'):
             logger.warning(f"Invalid action URL: {action}, skipping")
             return
+        if self.checkpoint and self.checkpoint.is_done(action, category, payload, parameter):
+            return
+        # 큐에 들어간 뒤 lane이 닫혔거나 예산이 소진된 작업은 보내지 않음
+        if not self.budget.is_open(action, category):
+            return
 
         try:
-            if action not in self.baselines:
-                baseline = await self.establish_baseline(session, {'action': action, 'inputs': form['inputs']})
-                if baseline:
-                    self.baselines[action] = baseline
-
-            start_time = time.time()
-            if method == 'post':
-                async with session.post(action, data=data) as resp:
-                    text = await resp.text()
-                    elapsed = time.time() - start_time
-                    await self.analyze_response(text, payload, form, resp.status, category, elapsed, session, resp.headers)
-            else:
-                async with session.get(action, params=data) as resp:
-                    text = await resp.text()
-                    elapsed = time.time() - start_time
-                    await self.analyze_response(text, payload, form, resp.status, category, elapsed, session, resp.headers)
+            # baseline 요청도 예산에서 차감되므로 baseline을 먼저 받은 뒤 이 요청 몫을 차감
+            baseline = await self.baselines.get(session, action, method, form['inputs'])
+            if not self.budget.acquire(action, category):
+                return
+
+            if self.progress:
+                self.progress.tick('request', action=action, category=category, parameter=parameter)
+            status, headers, body, encoding, elapsed = await self.send_request(session, method, action, data)
+            await self.analyze_response(body, payload, form, status, category, elapsed, session, headers,
+                                        encoding, baseline, parameter, origin)
         except asyncio.TimeoutError:
             cookies = session.cookie_jar.filter_cookies(action)
             logger.error(f"[TimeoutError] URL: {action}, Cookies: {cookies}")
-            self.attempts.append({'form_action': action, 'payload': payload, 'category': category, 'result': 'Timeout', 'status': 'N/A', 'elapsed': 0})
+            self.sink.add_attempt({'form_action': action, 'payload': payload, 'category': category, 'result': 'Timeout', 'status': 'N/A', 'elapsed': 0, 'parameter': parameter})
         except Exception as e:
             logger.error(f"[Request failed] URL: {action}, Error: {repr(e)}")
-            self.attempts.append({'form_action': action, 'payload': payload, 'category': category, 'result': 'Failed', 'status': 'N/A', 'elapsed': 0})
-        await asyncio.sleep(0.2)
-
-    def mutate_payload(self, payload):
-        if self.payload_generator.success_rate.get(payload, 0) > 70:
-            return self.apply_high_impact_mutations(payload)
+            self.sink.add_attempt({'form_action': action, 'payload': payload, 'category': category, 'result': 'Failed', 'status': 'N/A', 'elapsed': 0, 'parameter': parameter})
+        if self.rate_mode == 'fixed':
+            await asyncio.sleep(self.request_delay)
+
+    async def send_request(self, session, method, action, data):
+        host = urlparse(action).netloc
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(host)
+        start_time = time.time()
+        if method == 'post':
+            request = session.post(action, data=data)
         else:
-            return self.apply_diverse_mutations(payload)
-
-    def apply_high_impact_mutations(self, payload):
-        return payload * 2
-
-    def apply_diverse_mutations(self, payload):
-        return payload[::-1]
+            request = session.get(action, params=data)
+        try:
+            async with request as resp:
+                body = await resp.read()
+                elapsed = time.time() - start_time
+                self.record_rate(host, resp.status, elapsed)
+                return resp.status, resp.headers, body, resp.get_encoding(), elapsed
+        except asyncio.TimeoutError:
+            self.record_rate(host, timeout=True)
+            raise
+        except aiohttp.ClientConnectionError:
+            # 연결 거부/끊김도 서버 과부하 신호
+            self.record_rate(host, error=True)
+            raise
+
+    def record_rate(self, host, status=None, elapsed=None, timeout=False, error=False):
+        if self.rate_limiter:
+            self.rate_limiter.record(host, status, elapsed, timeout, error)
+
+    def mutate_payload(self, payload, category, key=None):
+        # 성공 점수가 높으면 의미 보존 인코딩 위주, 낮으면 문법/문맥 변형까지 폭넓게
+        score = self.payload_generator.success_rate.get(payload, 0)
+        if key is None:
+            return [mutant for _, mutant in self.mutator.mutate(payload, category, score)]
+        return [mutant for _, mutant in self.mutator.mutants(key, payload, category, score,
+                                                             self.operator_chooser(category))]
+
+    def mutation_seeds_for(self, category):
+        scores = self.payload_generator.success_rate
+        return sorted(self.payloads[category], key=lambda p: -scores.get(p, 0))[:self.mutation_seeds]
+
+    def operator_chooser(self, category):
+        if self.payload_order != 'bandit':
+            return None
+        return lambda operators: self.payload_generator.next_operator(category, operators)
+
+    def payloads_for(self, form, category):
+        # 증분 스캔의 회귀 확인 폼은 이전에 탐지됐던 페이로드만 사용
+        if 'payloads' in form:
+            return form['payloads'].get(category, [])
+        return self.payloads[category]
+
+    def iter_lanes(self):
+        # lane = 하나의 (폼, 파라미터 조합, 카테고리)
+        for form_id, form in enumerate(self.forms):
+            action = get_absolute_action_url(self.base_url, form.get('action', ''))
+            targets_list = placements(form, self.placement, self.fuzz_hidden)
+            for category in self.payloads:
+                if not self.payloads_for(form, category):
+                    continue
+                for targets in targets_list:
+                    screened = self.probe_screen and 'payloads' not in form
+                    if screened and not self.probe_screen.is_reactive(form_id, targets, category):
+                        continue
+                    yield form_id, form, action, targets, category
+
+    def iter_mutation_jobs(self, session, scheduler):
+        for form_id, form, action, targets, category in self.iter_lanes():
+            # 이미 탐지된 파라미터와 회귀 확인 폼에는 변이를 쓰지 않음
+            if (action, ','.join(targets), category) in self.found_keys or 'payloads' in form:
+                continue
+            key = (form_id, targets, category)
+            self.mutator.mark_seen(key, self.payloads[category])
+            for seed in self.mutation_seeds_for(category):
+                score = self.payload_generator.success_rate.get(seed, 0)
+                for operator, mutant in self.mutator.mutants(key, seed, category, score,
+                                                             self.operator_chooser(category)):
+                    if self.budget.exhausted():
+                        return
+                    if not self.budget.is_open(action, category):
+                        break
+                    yield scheduler.host_of(action), session, form, mutant, category, targets, (seed, operator)
+
+    def iter_jobs(self, session, scheduler):
+        if self.payload_order == 'bandit':
+            yield from self.iter_bandit_jobs(session, scheduler)
+            return
+        for form_id, form, action, targets, category in self.iter_lanes():
+            for payload in self.payloads_for(form, category):
+                if self.budget.exhausted():
+                    return
+                if not self.budget.is_open(action, category):
+                    break
+                yield scheduler.host_of(action), session, form, payload, category, targets
+
+    def iter_bandit_jobs(self, session, scheduler):
+        # 엔드포인트를 번갈아 돌면서 각 lane의 다음 페이로드를 밴딧이 선택
+        # (결과는 분석 단계에서 비동기로 들어오므로 앞선 lane의 탐지가 뒤 lane의 선택에 반영됨)
+        lanes = [(form, action, targets, category, list(self.payloads_for(form, category)))
+                 for _, form, action, targets, category in self.iter_lanes()]
+        while lanes:
+            for lane in list(lanes):
+                form, action, targets, category, remaining = lane
+                if self.budget.exhausted():
+                    return
+                if not remaining or not self.budget.is_open(action, category):
+                    lanes.remove(lane)
+                    continue
+                payload = self.payload_generator.next_payload(remaining)
+                remaining.remove(payload)
+                yield scheduler.host_of(action), session, form, payload, category, targets
+
+    def iter_probe_jobs(self, session, scheduler):
+        for form_id, form in enumerate(self.forms):
+            action = get_absolute_action_url(self.base_url, form.get('action', ''))
+            if not urlparse(action).scheme.startswith('http') or 'payloads' in form:
+                continue
+            method = form.get('method', 'get').lower()
+            for targets in placements(form, self.placement, self.fuzz_hidden):
+                for category in self.payloads:
+                    if self.budget.exhausted():
+                        return
+                    yield scheduler.host_of(action), session, form_id, form, targets, category, action, method
+
+    async def run_probe_phase(self, session):
+        self.probe_screen = ProbeScreen(self.send_request, self.baselines, self.analysis, acquire=self.budget.acquire)
+        scheduler = FuzzScheduler(
+            self.probe_screen.probe,
+            concurrency=self.concurrency,
+            per_host_concurrency=self.per_host_concurrency,
+            queue_size=self.queue_size
+        )
+        await scheduler.run(self.iter_probe_jobs(session, scheduler))
+        self.probe_screen.log_summary()
 
     async def run(self):
         logger.info("[AsyncFuzzer] Start")
-        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        estimates = estimate_all_modes(self.forms, self.payloads, self.fuzz_hidden)
+        logger.info(f"[AsyncFuzzer] Placement '{self.placement}': ~{estimates[self.placement]} requests "
+                    f"(all_at_once={estimates['all_at_once']}, one_at_a_time={estimates['one_at_a_time']}, "
+                    f"pairwise={estimates['pairwise']})")
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host_concurrency)
+        self.budget.start()
+        if self.progress:
+            planned = estimates[self.placement]
+            if self.budget.max_requests is not None:
+                planned = min(planned, self.budget.max_requests)
+            self.progress.plan(planned)
 
         async with aiohttp.ClientSession(connector=connector) as session:
             logged_in = await login_to_dvwa(session, self.base_url)
@@ -400,10 +541,36 @@ class AsyncFuzzer:
                 logger.warning("[Login] Failed. Stopping fuzzing.")
                 return []
 
-            for form in self.forms:
-                for category, payloads in self.payloads.items():
-                    for payload in payloads:
-                        await self.fuzz_form(session, form, payload, category)
+            # 프로브 응답도 분석 풀에서 판정하므로 프로브 단계 전에 시작
+            self.analysis.start()
+            try:
+                if self.two_phase:
+                    await self.run_probe_phase(session)
+
+                scheduler = FuzzScheduler(
+                    self.fuzz_form,
+                    concurrency=self.concurrency,
+                    per_host_concurrency=self.per_host_concurrency,
+                    queue_size=self.queue_size
+                )
+                await scheduler.run(self.iter_jobs(session, scheduler))
+                if self.mutate and not self.budget.exhausted():
+                    # 본 라운드 결과(탐지 여부, 성공 점수)가 모두 반영된 뒤 변이 라운드 시작
+                    await self.analysis.drain()
+                    await scheduler.run(self.iter_mutation_jobs(session, scheduler))
+                    logger.info(f"[Mutation] {self.mutator.total_spent()} mutants sent")
+                await self.coverage.flush(session)
+            finally:
+                await self.analysis.close()
+                self.sink.flush()
+                if self.checkpoint:
+                    self.flush_checkpoint()
+
+        if self.rate_limiter:
+            self.rate_limiter.log_summary()
+        budget = self.budget.summary()
+        logger.info(f"[Budget] {budget['requests']} requests in {budget['elapsed']}s, "
+                    f"{budget['closed_lanes']} endpoint/category pairs closed early")
 
         logger.info(f"[AsyncFuzzer] Vulnerability scan complete! {len(self.vulnerabilities)} issues found.")
         return self.vulnerabilities
@@ -0,0 +1,53 @@
+import math
+import random
+
+BANDIT_POLICIES = ('ucb', 'thompson')
+
+
+class Arm:
+    def __init__(self):
+        self.pulls = 0
+        self.reward = 0.0
+
+    def mean(self):
+        return min(1.0, self.reward / self.pulls) if self.pulls else 0.0
+
+
+class Bandit:
+    # 팔(arm) = 페이로드 또는 ('op', category, 연산자). 선택 시 pull, 탐지/커버리지 결과가 오면 reward
+    def __init__(self, policy='ucb', exploration=1.4, seed=None):
+        if policy not in BANDIT_POLICIES:
+            raise ValueError(f"Unknown bandit policy: {policy}")
+        self.policy = policy
+        self.exploration = exploration
+        self.arms = {}
+        self.total_pulls = 0
+        self.random = random.Random(seed)
+
+    def arm(self, key):
+        if key not in self.arms:
+            self.arms[key] = Arm()
+        return self.arms[key]
+
+    def score(self, key):
+        arm = self.arm(key)
+        if self.policy == 'thompson':
+            successes = min(arm.reward, arm.pulls)
+            return self.random.betavariate(1 + successes, 1 + arm.pulls - successes)
+        if not arm.pulls:
+            return math.inf
+        return arm.mean() + self.exploration * math.sqrt(math.log(self.total_pulls + 1) / arm.pulls)
+
+    def select(self, candidates):
+        # 동점이면 후보 순서(코퍼스 순서)를 유지
+        best = max(candidates, key=self.score)
+        self.pull(best)
+        return best
+
+    def pull(self, key):
+        self.arm(key).pulls += 1
+        self.total_pulls += 1
+
+    def reward(self, key, value):
+        if value:
+            self.arm(key).reward += value
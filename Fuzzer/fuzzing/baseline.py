@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from itertools import combinations
+from fuzzing.similarity import distance_ratio
+
+logger = logging.getLogger(__name__)
+
+
+def baseline_key(action, method, inputs):
+    return action, method.lower(), tuple(sorted(i['name'] for i in inputs if i.get('name')))
+
+
+def merge_samples(samples):
+    # 샘플 본문끼리 편집 거리를 계산하므로 이벤트 루프 밖(run_blocking)에서 실행
+    status = Counter(s['status'] for s in samples).most_common(1)[0][0]
+    contents = [s['content'] for s in samples]
+    # 같은 요청을 여러 번 보냈을 때의 차이(타임스탬프, CSRF 토큰 등) = 페이지 자체의 노이즈
+    noise = max((distance_ratio(a, b) for a, b in combinations(contents, 2)), default=0.0)
+    baseline = dict(samples[0])
+    baseline.update({
+        'status': status,
+        'elapsed': max(s['elapsed'] for s in samples),
+        'samples': len(samples),
+        'noise': round(noise, 4)
+    })
+    return baseline
+
+
+class BaselineCache:
+    # (action, method, 필드 목록)마다 baseline 요청은 한 번만 — 동시에 요청한 워커는 같은 결과를 기다림
+    # run_blocking(fn, *args): CPU 작업을 루프 밖에서 실행하는 코루틴 (없으면 바로 호출)
+    def __init__(self, fetch, samples=3, failure_ttl=60.0, run_blocking=None):
+        self.fetch = fetch
+        self.samples = max(1, samples)
+        self.failure_ttl = failure_ttl
+        self.run_blocking = run_blocking
+        self.cache = {}
+        self.failures = {}
+        self.inflight = {}
+
+    async def get(self, session, action, method, inputs):
+        key = baseline_key(action, method, inputs)
+        if key in self.cache:
+            return self.cache[key]
+        expires = self.failures.get(key)
+        if expires and expires > time.monotonic():
+            return None
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.establish(session, action, method, inputs))
+            self.inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self.finish(k, t))
+        return await asyncio.shield(task)
+
+    def finish(self, key, task):
+        self.inflight.pop(key, None)
+        baseline = None if task.cancelled() or task.exception() else task.result()
+        if baseline:
+            self.cache[key] = baseline
+            self.failures.pop(key, None)
+        else:
+            self.failures[key] = time.monotonic() + self.failure_ttl
+
+    async def establish(self, session, action, method, inputs):
+        # 샘플은 순서대로 하나씩 (fetch가 rate limiter/예산을 거치므로 한꺼번에 몰아 보내지 않음)
+        samples = []
+        for _ in range(self.samples):
+            try:
+                sample = await self.fetch(session, {'action': action, 'method': method, 'inputs': inputs})
+            except Exception as e:
+                logger.error(f"[Baseline request failed] {method.upper()} {action}, reason: {repr(e)}")
+                continue
+            if sample is None:
+                # 예산 소진 등으로 보낼 수 없음 → 남은 샘플도 보내지 않음
+                break
+            samples.append(sample)
+        if not samples:
+            logger.warning(f"[Baseline] No baseline for {method.upper()} {action}, retry after {self.failure_ttl}s")
+            return None
+        if self.run_blocking:
+            baseline = await self.run_blocking(merge_samples, samples)
+        else:
+            baseline = merge_samples(samples)
+        if baseline['noise']:
+            logger.info(f"[Baseline] Natural page noise {baseline['noise']:.1%} over {len(samples)} samples")
+        return baseline
@@ -0,0 +1,114 @@
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+BUDGET_FIELDS = ('max_requests', 'max_duration', 'max_requests_per_endpoint', 'max_findings_per_endpoint')
+
+
+class ScanBudget:
+    # 모든 한도는 None이면 무제한. 엔드포인트 = 폼 action URL, lane = (엔드포인트, 카테고리)
+    def __init__(self, max_requests=None, max_duration=None, max_requests_per_endpoint=None,
+                 max_findings_per_endpoint=None, stop_confidence=90):
+        self.max_requests = max_requests
+        self.max_duration = max_duration
+        self.max_requests_per_endpoint = max_requests_per_endpoint
+        self.max_findings_per_endpoint = max_findings_per_endpoint
+        # 시그니처 수준의 근거로 이 신뢰도 이상의 취약점이 확인되면 해당 lane은 더 퍼징하지 않음 (None이면 사용 안 함)
+        # 차분/휴리스틱 탐지는 lane을 닫지 않고 max_findings_per_endpoint에만 집계
+        self.stop_confidence = stop_confidence
+        self.started = None
+        self.requests = 0
+        self.by_endpoint = Counter()
+        self.findings = Counter()
+        self.closed = set()
+        self.reason = None
+
+    def start(self):
+        # 처음 한 번만. main()이 크롤링 전에 호출하므로 max_duration은 크롤링 시간도 포함
+        # (크롤링 자체는 중간에 끊지 않고, 초과했으면 퍼징을 시작하지 않음)
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started is not None else 0.0
+
+    def exhausted(self):
+        if self.reason:
+            return True
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            self.stop(f"request budget of {self.max_requests} reached")
+        elif self.max_duration is not None and self.elapsed() >= self.max_duration:
+            self.stop(f"time budget of {self.max_duration}s reached")
+        return self.reason is not None
+
+    def stop(self, reason):
+        if not self.reason:
+            self.reason = reason
+            logger.info(f"[Budget] Stopping scan: {reason} ({self.requests} requests, {self.elapsed():.1f}s)")
+
+    def endpoint_full(self, endpoint):
+        return self.max_requests_per_endpoint is not None and \
+            self.by_endpoint[endpoint] >= self.max_requests_per_endpoint
+
+    def is_open(self, endpoint, category):
+        return not self.exhausted() and not self.endpoint_full(endpoint) and (endpoint, category) not in self.closed
+
+    def acquire(self, endpoint, category=None):
+        # 확인과 차감 사이에 await가 없으므로 동시 워커가 있어도 한도를 넘지 않음
+        # category가 None이면 특정 lane에 속하지 않는 요청 (baseline 샘플 등)
+        if not self.is_open(endpoint, category):
+            return False
+        self.requests += 1
+        self.by_endpoint[endpoint] += 1
+        return True
+
+    def record_finding(self, endpoint, category, confidence, conclusive=False):
+        # conclusive: 시그니처 일치/실행 문맥 반영처럼 결정적인 근거로 나온 탐지
+        lane = (endpoint, category)
+        self.findings[lane] += 1
+        if lane in self.closed:
+            return
+        if conclusive and self.stop_confidence is not None and confidence >= self.stop_confidence:
+            self.closed.add(lane)
+            logger.info(f"[Budget] {category} on {endpoint} confirmed (confidence {confidence}), skipping the rest")
+        elif self.max_findings_per_endpoint is not None and self.findings[lane] >= self.max_findings_per_endpoint:
+            self.closed.add(lane)
+            logger.info(f"[Budget] {category} on {endpoint} reached {self.findings[lane]} findings, skipping the rest")
+
+    def state(self):
+        # 체크포인트에 저장할 누적값 (재개 시 restore)
+        return {'requests': self.requests, 'elapsed': round(self.elapsed(), 3)}
+
+    def restore(self, state):
+        # 이전 실행에서 쓴 요청 수와 시간을 이어서 계산. start() 전에 호출
+        if not state:
+            return
+        self.requests += state.get('requests', 0)
+        self.started = time.monotonic() - state.get('elapsed', 0)
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'elapsed': round(self.elapsed(), 1),
+            'closed_lanes': len(self.closed),
+            'stopped': self.reason
+        }
+
+
+def budget_from_options(options, limits=None):
+    # 폼/CLI 입력(문자열 허용)을 ScanBudget으로 변환. limits가 있으면 그 값을 상한으로 적용
+    values = {}
+    for field in BUDGET_FIELDS:
+        raw = options.get(field)
+        value = None
+        if raw not in (None, ''):
+            value = float(raw) if field == 'max_duration' else int(raw)
+            if value <= 0:
+                raise ValueError(f"{field} must be positive")
+        cap = (limits or {}).get(field)
+        if cap is not None:
+            value = cap if value is None else min(value, cap)
+        values[field] = value
+    return ScanBudget(**values)
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_ROOT = os.path.join("results", "checkpoints")
+
+
+def read_jsonl(path):
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # 비정상 종료로 마지막 줄이 잘린 경우
+                continue
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_atomic(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+class ScanCheckpoint:
+    # results/checkpoints/<result_hash>/ 아래에 스캔 상태를 조금씩 기록
+    #   scan.json   : 스캔 설정 (해시만으로 재개할 수 있도록)
+    #   crawl.jsonl : 정적 크롤링 진행 상황 (큐에 넣은 URL, 방문한 페이지)
+    #   crawl.json  : 크롤링 파이프라인 완료 후 결과
+    #   fuzz.jsonl  : 완료된 (엔드포인트, 카테고리, 페이로드, 파라미터)
+    #   budget.json : 지금까지 쓴 요청 수/소요 시간 (재개 시 예산에 이어서 적용)
+    def __init__(self, result_hash, root=CHECKPOINT_ROOT, batch_size=50):
+        self.result_hash = result_hash
+        self.directory = os.path.join(root, result_hash)
+        self.batch_size = batch_size
+        os.makedirs(self.directory, exist_ok=True)
+        self.done = {tuple(r) for r in read_jsonl(self.path('fuzz.jsonl'))}
+        self.buffer = []
+        self.crawl_file = None
+        self.fuzz_file = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    @classmethod
+    def exists(cls, result_hash, root=CHECKPOINT_ROOT):
+        return os.path.exists(os.path.join(root, result_hash, 'scan.json'))
+
+    @classmethod
+    def resumable(cls, result_hash, root=CHECKPOINT_ROOT):
+        settings = read_json(os.path.join(root, result_hash, 'scan.json'))
+        return bool(settings) and not settings.get('finished')
+
+    # --- scan settings / status ---
+    def save_settings(self, settings):
+        write_json_atomic(self.path('scan.json'), dict(settings, finished=False))
+
+    def load_settings(self):
+        return read_json(self.path('scan.json'))
+
+    def mark_finished(self):
+        settings = self.load_settings() or {}
+        write_json_atomic(self.path('scan.json'), dict(settings, finished=True))
+
+    # --- crawl ---
+    def append_crawl(self, record):
+        if self.crawl_file is None:
+            self.crawl_file = open(self.path('crawl.jsonl'), 'a', encoding='utf-8')
+        self.crawl_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.crawl_file.flush()
+
+    def record_enqueue(self, url, depth):
+        self.append_crawl({'kind': 'enqueue', 'url': url, 'depth': depth})
+
+    def record_page(self, url, result=None):
+        # result가 None이면 요청 실패/비정상 응답 페이지 (다시 방문하지 않음)
+        self.append_crawl({'kind': 'page', 'url': url, 'result': result})
+
+    def crawl_state(self):
+        # (URL별 depth, 방문 완료 URL, 추출 결과) — 남은 frontier = depth 목록 - 방문 완료
+        seen, visited, pages = {}, set(), []
+        for record in read_jsonl(self.path('crawl.jsonl')):
+            if record.get('kind') == 'enqueue':
+                seen.setdefault(record['url'], record['depth'])
+            elif record.get('kind') == 'page':
+                visited.add(record['url'])
+                if record.get('result'):
+                    pages.append(record['result'])
+        return seen, visited, pages
+
+    def save_crawl(self, crawled_urls, extraction):
+        write_json_atomic(self.path('crawl.json'), {'urls': sorted(crawled_urls), 'extraction': extraction})
+
+    def load_crawl(self):
+        data = read_json(self.path('crawl.json'))
+        if data is None:
+            return None
+        return set(data['urls']), data['extraction']
+
+    # --- budget ---
+    def save_budget(self, state):
+        write_json_atomic(self.path('budget.json'), state)
+
+    def load_budget(self):
+        return read_json(self.path('budget.json'))
+
+    # --- fuzzing ---
+    def is_done(self, endpoint, category, payload, parameter):
+        return (endpoint, category, payload, parameter) in self.done
+
+    def record_done(self, endpoint, category, payload, parameter):
+        # 배치가 찼는지 반환 → 호출 측이 결과 sink를 먼저 flush한 뒤 checkpoint를 flush
+        item = (endpoint, category, payload, parameter)
+        self.done.add(item)
+        self.buffer.append(json.dumps(item, ensure_ascii=False))
+        return len(self.buffer) >= self.batch_size
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.fuzz_file is None:
+            self.fuzz_file = open(self.path('fuzz.jsonl'), 'a', encoding='utf-8')
+        self.fuzz_file.write('\n'.join(self.buffer) + '\n')
+        self.fuzz_file.flush()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        for f in (self.crawl_file, self.fuzz_file):
+            if f:
+                f.close()
+        self.crawl_file = self.fuzz_file = None
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+COVERAGE_MODES = ('batched', 'per_request', 'off')
+
+
+class CoverageCollector:
+    # coverage.php를 응답마다 호출하지 않고, N개 요청 또는 일정 시간마다 한 번씩 조회
+    def __init__(self, coverage_url, tracker, payload_generator, mode='batched', every=20, interval=5.0):
+        if mode not in COVERAGE_MODES:
+            raise ValueError(f"Unknown coverage mode: {mode}")
+        self.coverage_url = coverage_url
+        self.tracker = tracker
+        self.payload_generator = payload_generator
+        self.mode = mode
+        self.every = 1 if mode == 'per_request' else max(1, every)
+        self.interval = interval
+        self.enabled = mode != 'off' and bool(coverage_url)
+        self.window = []
+        self.last_poll = time.monotonic()
+        self.polls = 0
+        self.lock = asyncio.Lock()
+
+    async def record(self, session, payload):
+        if not self.enabled:
+            return
+        self.window.append(payload)
+        if len(self.window) >= self.every or time.monotonic() - self.last_poll >= self.interval:
+            await self.poll(session)
+
+    async def poll(self, session):
+        if self.lock.locked():
+            # 다른 워커가 이미 조회 중이면 이번 윈도우는 다음 조회에 포함됨
+            return
+        async with self.lock:
+            batch, self.window = self.window, []
+            self.last_poll = time.monotonic()
+            if not batch:
+                return
+            coverage_data = await self.fetch(session)
+            if coverage_data is None:
+                return
+            new_paths = self.tracker.update(coverage_data)
+            if new_paths:
+                logger.info(f"[Coverage] {new_paths} new paths from a batch of {len(batch)} payloads")
+                self.payload_generator.update_coverage(batch)
+
+    async def fetch(self, session):
+        self.polls += 1
+        try:
+            async with session.get(self.coverage_url) as resp:
+                if resp.status == 404:
+                    self.enabled = False
+                    self.window = []
+                    logger.warning(f"[Coverage] {self.coverage_url} not found, coverage polling disabled")
+                    return None
+                if resp.status == 200:
+                    return await resp.json(content_type=None)
+        except Exception as e:
+            logger.error(f"Failed to get coverage data: {e}")
+        return None
+
+    async def flush(self, session):
+        if self.enabled and self.window:
+            await self.poll(session)
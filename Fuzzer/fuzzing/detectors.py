@@ -0,0 +1,196 @@
+import html
+import json
+import logging
+import os
+from bs4 import BeautifulSoup
+from fuzzing.similarity import SimilarityEngine
+from fuzzing.signatures import XSS_SNIPPET_MARKERS, default_engine
+
+logger = logging.getLogger(__name__)
+
+# 시그니처 일치로 판정되는 탐지 결과 (차분/시간 기반 결과는 제외)
+SIGNATURE_FINDINGS = {"SQL Injection", "Command Injection", "Path Traversal", "SSTI", "CSRF"}
+# 페이로드가 실행 가능한 문맥(script/속성/태그)에 그대로 반영된 XSS — 시그니처와 같은 수준의 근거
+REFLECTION_FINDINGS = {"XSS (script block)", "XSS (attribute injection)", "XSS (attribute list injection)",
+                       "XSS (HTML tag injection)"}
+# 탐지 근거별 기본 신뢰도: 시그니처 > 외부 리다이렉트 > 시간 지연 > 상태 코드 변화 > 본문 차이
+EVIDENCE_SCORES = {'signature': 95, 'redirect': 85, 'time': 70, 'status': 60, 'diff': 40}
+NOISE_MARGIN = 0.05
+
+
+class ResponseDetector:
+    def __init__(self, base_url=None, similarity=None, signatures=None):
+        self.base_url = base_url or ''
+        self.similarity = similarity or SimilarityEngine()
+        self.signatures = signatures or default_engine
+
+    def content_differ(self, text1, text2, threshold=0.2):
+        return self.similarity.differs(text1, text2, threshold)
+
+    def differs_from_baseline(self, text, baseline, threshold=0.2):
+        # baseline 샘플 간에 이미 관측된 노이즈(+ 여유분)만큼 임계값을 넓혀서 비교
+        noise = baseline.get('noise', 0)
+        if noise:
+            threshold += noise + NOISE_MARGIN
+        return self.content_differ(text, baseline['content'], threshold)
+
+    # --- Vulnerability detection logic ---
+    def detect_sqli(self, text, payload, baseline, status, elapsed, hits):
+        if 'sql_injection' in hits:
+            return "SQL Injection"
+        if baseline and (status != baseline['status'] or self.differs_from_baseline(text, baseline)):
+            return "SQL Injection (Differential)"
+        if 'sleep' in payload.lower() and baseline and elapsed > baseline.get('elapsed', 0) + 4:
+            return "Blind SQL Injection (Time-Based)"
+        return None
+
+    def detect_xss(self, text, payload, baseline):
+        if not text or not payload:
+            return None
+
+        if payload in text:
+            try:
+                soup = BeautifulSoup(text, 'html.parser')
+                for script in soup.find_all("script"):
+                    if payload in script.decode_contents():
+                        return "XSS (script block)"
+                for tag in soup.find_all(True):
+                    for attr_key, attr_val in tag.attrs.items():
+                        if isinstance(attr_val, str) and payload in attr_val:
+                            return "XSS (attribute injection)"
+                        elif isinstance(attr_val, list) and any(payload in v for v in attr_val):
+                            return "XSS (attribute list injection)"
+                if any(payload in str(tag) for tag in soup.find_all()):
+                    return "XSS (HTML tag injection)"
+            except Exception as e:
+                logger.warning(f"[XSS Parser] Parsing Failed: BeautifulSoup : {e}")
+
+        if html.escape(payload) in text and baseline and self.differs_from_baseline(text, baseline):
+            return "XSS (encoded context)"
+
+        if baseline and self.differs_from_baseline(text, baseline):
+            snippet = text[max(0, text.find(payload) - 30):text.find(payload) + 50]
+            if XSS_SNIPPET_MARKERS.search(snippet):
+                return "XSS (pattern-based heuristic)"
+        return None
+
+    def detect_command_injection(self, text, payload, baseline, elapsed, hits):
+        if 'command_injection' in hits:
+            return "Command Injection"
+        if ('sleep' in payload or 'ping' in payload) and baseline and elapsed > baseline.get('elapsed', 0) + 3:
+            return "Command Injection (Time-Based)"
+        if baseline and self.differs_from_baseline(text, baseline):
+            return "Command Injection (Differential)"
+        return None
+
+    def detect_path_traversal(self, text, payload, baseline, hits):
+        if 'path_traversal' in hits and baseline and self.differs_from_baseline(text, baseline):
+            return "Path Traversal"
+        return None
+
+    def detect_ssti(self, text, payload, hits):
+        if 'ssti' in hits:
+            return "SSTI"
+        return None
+
+    def detect_open_redirect(self, text, payload, status, resp_headers):
+        location = resp_headers.get('Location', '')
+        if status in [301, 302, 303, 307, 308] and location and not location.startswith(self.base_url):
+            return "Open Redirect"
+        return None
+
+    def detect_csrf(self, text, payload, baseline, hits):
+        if baseline and 'csrf' in hits and self.differs_from_baseline(text, baseline):
+            return "CSRF"
+        return None
+
+    def extract_evidence(self, text, payload):
+        idx = text.find(payload)
+        if idx == -1:
+            return text[:200]
+        start = max(0, idx - 50)
+        end = min(len(text), idx + 50)
+        return text[start:end]
+
+    def detect(self, category, text, payload, baseline, status, elapsed, resp_headers, hits=None):
+        if hits is None:
+            hits = self.signatures.scan(text)
+        found = None
+        if category == 'sql_injection':
+            found = self.detect_sqli(text, payload, baseline, status, elapsed, hits)
+        elif category == 'xss':
+            found = self.detect_xss(text, payload, baseline)
+        elif category == 'command_injection':
+            found = self.detect_command_injection(text, payload, baseline, elapsed, hits)
+        elif category == 'path_traversal':
+            found = self.detect_path_traversal(text, payload, baseline, hits)
+        elif category == 'ssti':
+            found = self.detect_ssti(text, payload, hits)
+        elif category == 'open_redirect':
+            found = self.detect_open_redirect(text, payload, status, resp_headers)
+        elif category == 'csrf':
+            found = self.detect_csrf(text, payload, baseline, hits)
+        return found
+
+    def evidence_class(self, found, status, baseline):
+        # 탐지 결과가 어떤 근거로 나왔는지 (EVIDENCE_SCORES의 키)
+        if found in SIGNATURE_FINDINGS or found in REFLECTION_FINDINGS:
+            return 'signature'
+        if found == "Open Redirect":
+            return 'redirect'
+        if 'Time-Based' in found:
+            return 'time'
+        if baseline and status != baseline['status']:
+            return 'status'
+        return 'diff'
+
+    def analyze(self, category, body, encoding, payload, baseline, status, elapsed, location):
+        # 본문은 bytes로 넘겨받아 디코딩까지 워커에서 처리
+        text = body.decode(encoding or 'utf-8', errors='replace') if isinstance(body, bytes) else body
+        # 모든 카테고리의 시그니처를 한 번의 스캔으로 확인
+        hits = self.signatures.scan(text)
+        found = self.detect(category, text, payload, baseline, status, elapsed, {'Location': location}, hits)
+        if not found:
+            return None, "", None, None
+        evidence = self.extract_evidence(text, payload)
+        signature = hits[category].name if found in SIGNATURE_FINDINGS and category in hits else None
+        return found, evidence, signature, self.evidence_class(found, status, baseline)
+
+
+# ProcessPoolExecutor 워커마다 한 번만 생성되는 detector와 baseline 캐시 (키 → baseline)
+_worker_detector = None
+_worker_baseline_dir = None
+_worker_baselines = {}
+WORKER_BASELINE_CACHE = 256
+
+
+def baseline_file(directory, key):
+    return os.path.join(directory, f"{key}.json")
+
+
+def init_worker(base_url, similarity_mode, dom_text, baseline_dir=None):
+    global _worker_detector, _worker_baseline_dir
+    _worker_detector = ResponseDetector(base_url, SimilarityEngine(mode=similarity_mode, dom_text=dom_text))
+    _worker_baseline_dir = baseline_dir
+
+
+def worker_baseline(key):
+    # 작업에는 baseline 키만 오고, 본문은 워커마다 처음 한 번만 파일에서 읽음
+    if key not in _worker_baselines:
+        if len(_worker_baselines) >= WORKER_BASELINE_CACHE:
+            _worker_baselines.pop(next(iter(_worker_baselines)))
+        with open(baseline_file(_worker_baseline_dir, key), 'r', encoding='utf-8') as f:
+            _worker_baselines[key] = json.load(f)
+    return _worker_baselines[key]
+
+
+def call_in_worker(fn, baseline, *args):
+    if isinstance(baseline, str):
+        baseline = worker_baseline(baseline)
+    return fn(_worker_detector, baseline, *args)
+
+
+def analyze_in_worker(category, body, encoding, payload, baseline, *rest):
+    if isinstance(baseline, str):
+        baseline = worker_baseline(baseline)
+    return _worker_detector.analyze(category, body, encoding, payload, baseline, *rest)
@@ -0,0 +1,63 @@
+import logging
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_action(url):
+    parsed = urlparse(url or '')
+    scheme = parsed.scheme.lower()
+    netloc = parsed.hostname or ''
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parsed.port}"
+    path = parsed.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, path, '', query, ''))
+
+
+def form_key(form):
+    return (
+        normalize_action(form.get('action')),
+        form.get('method', 'get').lower(),
+        tuple(sorted((i.get('name') or '', i.get('type') or '') for i in form.get('inputs', []) if i.get('name')))
+    )
+
+
+class FormIndex:
+    # (정규화된 action, method, 필드 이름/타입) 기준으로 같은 엔드포인트는 한 번만 퍼징
+    def __init__(self, group_inputs=False):
+        self.group_inputs = group_inputs
+        self.entries = {}
+        self.total = 0
+
+    def add(self, form, source_url=None):
+        self.total += 1
+        key = form_key(form)
+        if not key[2]:
+            return
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = dict(form, sources=[])
+            self.entries[key] = entry
+        if source_url and source_url not in entry['sources']:
+            entry['sources'].append(source_url)
+
+    def add_extraction(self, extraction):
+        for result in extraction:
+            for form in result.get('forms', []):
+                self.add(form, result['url'])
+            fields = [f for f in result.get('independent_inputs', []) if f.get('name')]
+            if self.group_inputs and fields:
+                # 같은 페이지의 독립 입력 필드를 하나의 합성 폼으로 묶음
+                self.add({'action': result['url'], 'method': 'get', 'inputs': fields, 'synthetic': True}, result['url'])
+            else:
+                for field in fields:
+                    self.add({'action': result['url'], 'method': 'get', 'inputs': [field]}, result['url'])
+
+    def forms(self):
+        return list(self.entries.values())
+
+    def log_summary(self):
+        logger.info(f"[FormIndex] {self.total} forms collected → {len(self.entries)} unique endpoints")
@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import re
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_RE = re.compile(r'[A-Za-z]{3,}')
+SPECIAL_CHARS = '<>\'"();&|/\\'
+FULLWIDTH = {c: chr(ord(c) + 0xFEE0) for c in '<>\'"();&|/'}
+
+
+# --- Mutation operators: payload → mutant (변화가 없으면 원본 그대로 반환) ---
+def url_encode(payload):
+    return quote(payload, safe='')
+
+
+def double_url_encode(payload):
+    return quote(quote(payload, safe=''), safe='')
+
+
+def html_entity_encode(payload):
+    return ''.join(f'&#x{ord(c):x};' if c in SPECIAL_CHARS else c for c in payload)
+
+
+def unicode_escape(payload):
+    return ''.join(f'\\u{ord(c):04x}' if c in SPECIAL_CHARS else c for c in payload)
+
+
+def fullwidth(payload):
+    # 서버 측 유니코드 정규화(NFKC)를 거치면 원래 문자로 돌아옴
+    return ''.join(FULLWIDTH.get(c, c) for c in payload)
+
+
+def toggle_case(payload):
+    def toggle(m):
+        word = m.group(0)
+        return ''.join(c.upper() if i % 2 == 0 else c.lower() for i, c in enumerate(word))
+    return KEYWORD_RE.sub(toggle, payload)
+
+
+def sql_comment(payload):
+    return payload.replace(' ', '/**/')
+
+
+def shell_separator(payload):
+    return payload.replace(' ', '${IFS}')
+
+
+def html_comment(payload):
+    return re.sub(r'<(\w)', r'<!---->\g<0>', payload, count=1)
+
+
+def swap_quotes(payload):
+    return payload.translate(str.maketrans({"'": '"', '"': "'"}))
+
+
+def close_attribute(payload):
+    return payload if payload.startswith(('">', "'>")) else '">' + payload
+
+
+def close_parenthesis(payload):
+    return payload if payload.startswith("')") else "')" + payload.lstrip("'")
+
+
+def newline_separator(payload):
+    return re.sub(r'^[;|&]+\s*', '\n', payload)
+
+
+def traversal_dot_encode(payload):
+    return payload.replace('../', '%2e%2e%2f')
+
+
+def traversal_nested(payload):
+    return payload.replace('../', '....//')
+
+
+MUTATION_OPERATORS = {
+    'url_encode': url_encode,
+    'double_url_encode': double_url_encode,
+    'html_entity': html_entity_encode,
+    'unicode_escape': unicode_escape,
+    'fullwidth': fullwidth,
+    'toggle_case': toggle_case,
+    'sql_comment': sql_comment,
+    'shell_separator': shell_separator,
+    'html_comment': html_comment,
+    'swap_quotes': swap_quotes,
+    'close_attribute': close_attribute,
+    'close_parenthesis': close_parenthesis,
+    'newline_separator': newline_separator,
+    'traversal_dot_encode': traversal_dot_encode,
+    'traversal_nested': traversal_nested,
+}
+
+# 카테고리별로 문법을 깨뜨리지 않는 연산자만 사용 (앞쪽일수록 우선)
+CATEGORY_OPERATORS = {
+    'sql_injection': ['toggle_case', 'sql_comment', 'swap_quotes', 'close_parenthesis', 'url_encode', 'fullwidth'],
+    'xss': ['toggle_case', 'close_attribute', 'swap_quotes', 'html_comment', 'html_entity', 'url_encode',
+            'unicode_escape'],
+    'command_injection': ['shell_separator', 'newline_separator', 'url_encode', 'double_url_encode'],
+    'path_traversal': ['traversal_nested', 'traversal_dot_encode', 'url_encode', 'double_url_encode'],
+    'ssti': ['url_encode', 'unicode_escape'],
+    'open_redirect': ['url_encode', 'double_url_encode', 'toggle_case'],
+    'csrf': ['url_encode'],
+}
+# 성공 점수가 높은 시드는 의미를 보존하는 인코딩만 거쳐 필터 우회를 시도
+HIGH_IMPACT_OPERATORS = {'url_encode', 'double_url_encode', 'html_entity', 'unicode_escape', 'fullwidth',
+                         'traversal_dot_encode'}
+
+
+def payload_hash(payload):
+    return hashlib.sha1(payload.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class MutationEngine:
+    def __init__(self, budget_per_parameter=10, high_impact_score=70, operators=CATEGORY_OPERATORS):
+        self.budget_per_parameter = budget_per_parameter
+        self.high_impact_score = high_impact_score
+        self.operators = operators
+        self.seen = {}
+        self.spent = {}
+
+    def operators_for(self, category, score=0):
+        names = self.operators.get(category, ['url_encode'])
+        if score > self.high_impact_score:
+            return [n for n in names if n in HIGH_IMPACT_OPERATORS] or names
+        return names
+
+    def mutate(self, payload, category, score=0):
+        # 예산/중복과 무관하게 적용 가능한 (연산자, 변이) 목록
+        mutants = []
+        for name in self.operators_for(category, score):
+            mutant = MUTATION_OPERATORS[name](payload)
+            if mutant != payload:
+                mutants.append((name, mutant))
+        return mutants
+
+    def remaining(self, key):
+        return self.budget_per_parameter - self.spent.get(key, 0)
+
+    def mark_seen(self, key, payloads):
+        seen = self.seen.setdefault(key, set())
+        seen.update(payload_hash(p) for p in payloads)
+
+    def accept(self, key, mutant):
+        seen = self.seen.setdefault(key, set())
+        digest = payload_hash(mutant)
+        if digest in seen:
+            return False
+        seen.add(digest)
+        self.spent[key] = self.spent.get(key, 0) + 1
+        return True
+
+    def mutants(self, key, payload, category, score=0, choose=None):
+        # key: (form, 파라미터, 카테고리) — 키마다 중복 제거 + 변이 예산 적용
+        # choose: 남은 연산자 이름 목록을 받아 다음에 쓸 연산자를 고름 (없으면 정의 순서)
+        candidates = dict(self.mutate(payload, category, score))
+        while candidates and self.remaining(key) > 0:
+            name = choose(list(candidates)) if choose else next(iter(candidates))
+            mutant = candidates.pop(name)
+            if self.accept(key, mutant):
+                yield name, mutant
+
+    def total_spent(self):
+        return sum(self.spent.values())
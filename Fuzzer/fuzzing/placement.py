@@ -0,0 +1,78 @@
+import re
+from itertools import combinations
+from math import comb
+
+PLACEMENT_MODES = ('all_at_once', 'one_at_a_time', 'pairwise')
+
+# 페이로드를 넣을 수 있는 입력 타입 (input 태그에 type이 없으면 크롤러가 'input'으로 기록)
+FUZZABLE_TYPES = {'text', 'textarea', 'search', 'email', 'url', 'tel', 'password', 'input'}
+# hidden 필드는 대부분 CSRF 토큰/상태 값이라 덮어쓰면 요청이 싱크에 닿기 전에 거부됨 → include_hidden일 때만 퍼징
+# 그때도 토큰처럼 보이는 이름은 제외
+HIDDEN_TYPES = {'hidden'}
+TOKEN_NAME_RE = re.compile(r'csrf|xsrf|token|nonce|authenticity|verification|__viewstate|__eventvalidation', re.I)
+
+DEFAULT_VALUES = {
+    'email': 'test@example.com',
+    'url': 'http://example.com',
+    'tel': '01012345678',
+    'number': '1',
+    'range': '1',
+    'date': '2024-01-01',
+    'checkbox': 'on',
+}
+
+
+def is_fuzzable(field, include_hidden=False):
+    field_type = (field.get('type') or 'text').lower()
+    if field_type in HIDDEN_TYPES:
+        return include_hidden and not TOKEN_NAME_RE.search(field['name'])
+    return field_type in FUZZABLE_TYPES
+
+
+def fuzzable_fields(form, include_hidden=False):
+    return [i['name'] for i in form.get('inputs', []) if i.get('name') and is_fuzzable(i, include_hidden)]
+
+
+def build_data(form, payload, targets):
+    targets = set(targets)
+    return {
+        i['name']: payload if i['name'] in targets else DEFAULT_VALUES.get((i.get('type') or '').lower(), 'test')
+        for i in form.get('inputs', []) if i.get('name')
+    }
+
+
+def placements(form, mode='all_at_once', include_hidden=False):
+    # 페이로드가 들어갈 필드 조합 목록 — 결과에 어떤 파라미터였는지 기록하기 위해 사용
+    fields = fuzzable_fields(form, include_hidden)
+    if not fields:
+        return []
+    if mode == 'all_at_once':
+        return [tuple(fields)]
+    if mode == 'one_at_a_time':
+        return [(f,) for f in fields]
+    if mode == 'pairwise':
+        if len(fields) < 2:
+            return [tuple(fields)]
+        return list(combinations(fields, 2))
+    raise ValueError(f"Unknown placement mode: {mode}")
+
+
+def placement_count(field_count, mode):
+    if not field_count:
+        return 0
+    if mode == 'all_at_once':
+        return 1
+    if mode == 'one_at_a_time':
+        return field_count
+    if mode == 'pairwise':
+        return comb(field_count, 2) if field_count >= 2 else 1
+    raise ValueError(f"Unknown placement mode: {mode}")
+
+
+def estimate_requests(forms, payloads, mode='all_at_once', include_hidden=False):
+    payload_count = sum(len(v) for v in payloads.values())
+    return sum(placement_count(len(fuzzable_fields(form, include_hidden)), mode) for form in forms) * payload_count
+
+
+def estimate_all_modes(forms, payloads, include_hidden=False):
+    return {mode: estimate_requests(forms, payloads, mode, include_hidden) for mode in PLACEMENT_MODES}
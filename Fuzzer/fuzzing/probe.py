@@ -0,0 +1,104 @@
+import logging
+import uuid
+from fuzzing.placement import build_data
+from fuzzing.signatures import default_engine
+
+logger = logging.getLogger(__name__)
+
+# 카테고리별 카나리 프로브 ({marker}는 스캔마다 고유한 문자열로 치환)
+CANARY_PROBES = {
+    'sql_injection': ["{marker}'", '{marker}"', "{marker}')--"],
+    'xss': ['{marker}<"\'>'],
+    'command_injection': [';echo {marker}', '|echo {marker}'],
+    'path_traversal': ['../{marker}', '....//{marker}'],
+    'ssti': ['{marker}{{7*7}}', '{marker}${7*7}'],
+    'open_redirect': ['//{marker}.example.com'],
+    'csrf': ['{marker}'],
+}
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+def signature_categories(text):
+    return frozenset(default_engine.scan(text))
+
+
+def probe_reaction(detector, baseline, marker, category, body, encoding, status, location, baseline_categories):
+    # 분석 풀에서 실행 (AnalysisStage.run_with_detector) — 디코딩, 시그니처 스캔, baseline 비교 모두 루프 밖에서
+    text = body.decode(encoding or 'utf-8', errors='replace')
+    if marker in text:
+        return 'reflected'
+    if status >= 500:
+        return 'server error'
+    if status in REDIRECT_STATUSES and marker in location:
+        return 'redirect'
+    hits = default_engine.scan(text, [category])
+    # baseline에도 있던 시그니처는 반응으로 보지 않음
+    if category in hits and category not in baseline_categories:
+        return f"signature {hits[category].name}"
+    if baseline:
+        if status != baseline['status']:
+            return 'status changed'
+        if detector.differs_from_baseline(text, baseline):
+            return 'content changed'
+    return None
+
+
+class ProbeScreen:
+    # 1단계: 저렴한 카나리 프로브로 반응하는 (폼, 파라미터, 카테고리)만 골라냄
+    def __init__(self, send, baselines, analysis, probes=CANARY_PROBES, acquire=None):
+        self.send = send
+        # acquire(endpoint, category): 스캔 예산이 남았는지 확인하고 요청 1건을 차감
+        self.acquire = acquire
+        self.baselines = baselines
+        # 응답 분석은 본 퍼징과 같은 분석 풀(AnalysisStage)에서
+        self.analysis = analysis
+        self.probes = probes
+        self.marker = 'wf' + uuid.uuid4().hex[:8]
+        self.reactive = set()
+        self.probed = set()
+        self.requests = 0
+        # id(baseline) → (baseline, baseline 본문에 이미 있는 시그니처 카테고리). baseline마다 한 번만 스캔
+        self.baseline_hits = {}
+
+    def probe_payloads(self, category):
+        return [p.replace('{marker}', self.marker) for p in self.probes.get(category, ['{marker}'])]
+
+    async def baseline_categories(self, baseline):
+        if not baseline:
+            return frozenset()
+        entry = self.baseline_hits.get(id(baseline))
+        if entry is None:
+            entry = (baseline, await self.analysis.run_blocking(signature_categories, baseline['content']))
+            self.baseline_hits[id(baseline)] = entry
+        return entry[1]
+
+    async def reaction(self, category, body, encoding, status, headers, baseline):
+        baseline_categories = await self.baseline_categories(baseline)
+        return await self.analysis.run_with_detector(probe_reaction, baseline, self.marker, category, body, encoding,
+                                                     status, headers.get('Location', ''), baseline_categories)
+
+    async def probe(self, session, form_id, form, targets, category, action, method):
+        key = (form_id, targets, category)
+        self.probed.add(key)
+        baseline = await self.baselines.get(session, action, method, form['inputs'])
+        for payload in self.probe_payloads(category):
+            if self.acquire and not self.acquire(action, category):
+                return
+            self.requests += 1
+            try:
+                status, headers, body, encoding, _ = await self.send(session, method, action, build_data(form, payload, targets))
+            except Exception as e:
+                logger.debug(f"[Probe] {action} failed: {repr(e)}")
+                continue
+            reason = await self.reaction(category, body, encoding, status, headers, baseline)
+            if reason:
+                self.reactive.add(key)
+                logger.info(f"[Probe] {category} reactive: {action} [{','.join(targets)}] ({reason})")
+                return
+
+    def is_reactive(self, form_id, targets, category):
+        return (form_id, targets, category) in self.reactive
+
+    def log_summary(self):
+        logger.info(f"[Probe] {len(self.reactive)}/{len(self.probed)} parameter/category pairs reacted "
+                    f"({self.requests} probe requests)")
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_STATUSES = (429, 503)
+
+
+class HostRate:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.latencies = deque(maxlen=50)
+        self.baseline_p95 = None
+        self.peak_rate = rate
+        self.backoffs = 0
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def p95(self):
+        if not self.latencies:
+            return 0
+        # nearest-rank: 20개 이상이면 가장 느린 한 건은 p95에 들어가지 않음
+        ordered = sorted(self.latencies)
+        return ordered[math.ceil(len(ordered) * 0.95) - 1]
+
+
+class AdaptiveRateLimiter:
+    # AIMD: 정상 응답이면 rate를 조금씩 올리고, 과부하 신호가 오면 절반으로 줄임
+    def __init__(self, initial_rate=5.0, min_rate=0.5, max_rate=200.0, increase=0.5,
+                 decrease=0.5, burst=5, latency_factor=2.0, min_samples=20):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.latency_factor = latency_factor
+        # 지연 시간 비교에 필요한 최소 샘플 수 (적으면 p95가 사실상 최댓값이라 이상치 하나에 감속됨)
+        self.min_samples = min_samples
+        self.hosts = {}
+
+    def host_state(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = HostRate(self.initial_rate, self.burst)
+        return self.hosts[host]
+
+    async def acquire(self, host):
+        state = self.host_state(host)
+        async with state.lock:
+            while True:
+                state.refill()
+                if state.tokens >= 1:
+                    state.tokens -= 1
+                    return
+                await asyncio.sleep((1 - state.tokens) / state.rate)
+
+    def record(self, host, status=None, elapsed=None, timeout=False, error=False):
+        # error: 연결 거부/끊김 등 응답을 받지 못한 경우 (timeout과 같이 과부하 신호로 취급)
+        state = self.host_state(host)
+        if elapsed is not None and not timeout and not error:
+            state.latencies.append(elapsed)
+
+        p95 = state.p95()
+        if state.baseline_p95 is None and len(state.latencies) >= self.min_samples:
+            state.baseline_p95 = p95
+
+        overloaded = timeout or error or status in BACKOFF_STATUSES or (
+            state.baseline_p95 and p95 > state.baseline_p95 * self.latency_factor
+        )
+        if overloaded:
+            state.rate = max(self.min_rate, state.rate * self.decrease)
+            state.tokens = min(state.tokens, 0)
+            state.backoffs += 1
+            # 감속 후에는 기준 지연 시간도 버리고 min_samples개를 새로 모아 다시 측정
+            state.latencies.clear()
+            state.baseline_p95 = None
+            logger.debug(f"[RateLimiter] {host} back off → {state.rate:.2f} req/s "
+                         f"(status={status}, timeout={timeout}, error={error}, p95={p95:.2f}s)")
+        else:
+            state.rate = min(self.max_rate, state.rate + self.increase)
+            state.peak_rate = max(state.peak_rate, state.rate)
+
+    def summary(self):
+        return {
+            host: {
+                'rate': round(state.rate, 2),
+                'peak_rate': round(state.peak_rate, 2),
+                'backoffs': state.backoffs,
+                'p95': round(state.p95(), 3)
+            }
+            for host, state in self.hosts.items()
+        }
+
+    def log_summary(self):
+        for host, s in self.summary().items():
+            logger.info(f"[RateLimiter] Rate for {host}: final {s['rate']} req/s, "
+                        f"peak {s['peak_rate']} req/s, {s['backoffs']} backoffs, p95 {s['p95']}s")
@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from database.schema import connect, init_db
+
+logger = logging.getLogger(__name__)
+
+NO_FINDING_RESULTS = ('No vulnerability detected', 'Timeout', 'Failed')
+
+
+class SinkView:
+    # 리스트처럼 len()/bool()/for 문을 지원하지만, 순회할 때마다 sink에서 다시 읽어옴
+    def __init__(self, count, iterate):
+        self.count = count
+        self.iterate = iterate
+
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        return self.count() > 0
+
+    def __iter__(self):
+        return self.iterate()
+
+
+class ResultSink(ABC):
+    # 구현체는 write_*/iter_*를 모두 정의해야 함 (빠뜨리면 스캔 도중이 아니라 생성 시점에 TypeError)
+    def __init__(self):
+        self.attempt_count = 0
+        self.vuln_count = 0
+        self.by_category = Counter()
+        self.by_result = Counter()
+        self.by_type = Counter()
+
+    def add_attempt(self, attempt):
+        self.attempt_count += 1
+        self.by_category[attempt.get('category')] += 1
+        self.by_result[attempt.get('result')] += 1
+        self.write_attempt(attempt)
+
+    def add_vulnerability(self, vuln):
+        self.vuln_count += 1
+        self.by_type[vuln.get('type')] += 1
+        self.write_vulnerability(vuln)
+
+    @abstractmethod
+    def write_attempt(self, attempt):
+        ...
+
+    @abstractmethod
+    def write_vulnerability(self, vuln):
+        ...
+
+    @abstractmethod
+    def iter_attempts(self):
+        ...
+
+    @abstractmethod
+    def iter_vulnerabilities(self):
+        ...
+
+    @property
+    def attempts(self):
+        return SinkView(lambda: self.attempt_count, self.iter_attempts)
+
+    @property
+    def vulnerabilities(self):
+        return SinkView(lambda: self.vuln_count, self.iter_vulnerabilities)
+
+    def summary(self):
+        return {
+            'attempts': self.attempt_count,
+            'vulnerabilities': self.vuln_count,
+            'by_category': dict(self.by_category),
+            'by_result': dict(self.by_result),
+            'by_type': dict(self.by_type)
+        }
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class MemorySink(ResultSink):
+    def __init__(self):
+        super().__init__()
+        self.attempt_list = []
+        self.vuln_list = []
+
+    def write_attempt(self, attempt):
+        self.attempt_list.append(attempt)
+
+    def write_vulnerability(self, vuln):
+        self.vuln_list.append(vuln)
+
+    def iter_attempts(self):
+        return iter(self.attempt_list)
+
+    def iter_vulnerabilities(self):
+        return iter(self.vuln_list)
+
+    @property
+    def attempts(self):
+        return self.attempt_list
+
+    @property
+    def vulnerabilities(self):
+        return self.vuln_list
+
+
+class JSONLSink(ResultSink):
+    # 추가 전용 JSONL 파일: 한 줄에 한 건, 'kind'로 시도/취약점 구분
+    def __init__(self, path, batch_size=200):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, kind, record):
+        self.buffer.append(json.dumps(dict(record, kind=kind), ensure_ascii=False, default=str))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_attempt(self, attempt):
+        self.write('attempt', attempt)
+
+    def write_vulnerability(self, vuln):
+        self.write('vulnerability', vuln)
+
+    def flush(self):
+        if self.buffer and not self.file.closed:
+            self.file.write('\n'.join(self.buffer) + '\n')
+            self.file.flush()
+            self.buffer = []
+
+    def iter_kind(self, kind):
+        self.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record.pop('kind', None) == kind:
+                    yield record
+
+    def iter_attempts(self):
+        return self.iter_kind('attempt')
+
+    def iter_vulnerabilities(self):
+        return self.iter_kind('vulnerability')
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class SQLiteSink(ResultSink):
+    # 웹 UI가 읽는 attempts/vulnerabilities 테이블에 스캔 도중 배치로 기록 (WAL 모드)
+    # job: 분산 워커의 (작업 id, 실행 번호). 재시도된 작업의 이전 실행 행을 구분하는 데 사용
+    def __init__(self, db_path, result_id, batch_size=500, job=None):
+        super().__init__()
+        self.db_path = db_path
+        self.result_id = result_id
+        self.job, self.job_attempt = (str(job[0]), job[1]) if job else (None, None)
+        self.batch_size = batch_size
+        self.attempt_rows = []
+        self.vuln_rows = []
+        init_db(db_path)
+        self.conn = connect(db_path)
+        self.load_counts()
+
+    def load_counts(self):
+        # 재개된 스캔이면 이전에 기록된 행까지 집계에 포함
+        for category, result, count in self.conn.execute(
+                "SELECT category, response, COUNT(*) FROM attempts WHERE result_id = ? GROUP BY category, response",
+                (self.result_id,)):
+            self.attempt_count += count
+            self.by_category[category] += count
+            self.by_result[result] += count
+        for vtype, count in self.conn.execute(
+                "SELECT type, COUNT(*) FROM vulnerabilities WHERE result_id = ? GROUP BY type", (self.result_id,)):
+            self.vuln_count += count
+            self.by_type[vtype] += count
+
+    def write_attempt(self, a):
+        result = a.get('result', '')
+        self.attempt_rows.append((
+            self.result_id, a.get('form_action', ''), a.get('payload', ''), result,
+            result not in NO_FINDING_RESULTS, a.get('category', ''), str(a.get('status', '')), a.get('elapsed', 0),
+            a.get('parameter'), self.job, self.job_attempt
+        ))
+        if len(self.attempt_rows) >= self.batch_size:
+            self.flush()
+
+    def write_vulnerability(self, v):
+        self.vuln_rows.append((
+            self.result_id, v.get('form', ''), v.get('type', ''), v.get('payload', ''),
+            v.get('confidence', 0), v.get('evidence', ''), str(v.get('response_code', '')), v.get('signature'),
+            v.get('parameter'), self.job, self.job_attempt
+        ))
+        # 취약점은 건수가 적고 중요하므로 바로 기록
+        self.flush()
+
+    def flush(self):
+        if not self.attempt_rows and not self.vuln_rows:
+            return
+        with self.conn:
+            if self.attempt_rows:
+                self.conn.executemany("""
+                    INSERT INTO attempts (result_id, form, payload, response, is_successful, category, status, elapsed, parameter,
+                                          job, job_attempt)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, self.attempt_rows)
+            if self.vuln_rows:
+                self.conn.executemany("""
+                    INSERT INTO vulnerabilities (result_id, form, type, payload, confidence, evidence, response_code, signature,
+                                                 parameter, job, job_attempt)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, self.vuln_rows)
+        self.attempt_rows, self.vuln_rows = [], []
+
+    def discard_other_runs(self, job, attempt):
+        # 같은 작업의 다른 실행(재시도 전 실행, 임대 만료 후에도 돌던 실행)이 남긴 행 삭제 후 집계 다시 계산
+        self.flush()
+        with self.conn:
+            removed = sum(self.conn.execute(
+                f"DELETE FROM {table} WHERE result_id = ? AND job = ? AND job_attempt != ?",
+                (self.result_id, str(job), attempt)).rowcount for table in ('attempts', 'vulnerabilities'))
+        if removed:
+            self.attempt_count = self.vuln_count = 0
+            self.by_category.clear()
+            self.by_result.clear()
+            self.by_type.clear()
+            self.load_counts()
+
+    def iter_attempts(self):
+        self.flush()
+        cur = self.conn.execute("""
+            SELECT form, payload, category, response, status, elapsed, parameter FROM attempts
+            WHERE result_id = ? ORDER BY id
+        """, (self.result_id,))
+        for form, payload, category, result, status, elapsed, parameter in cur:
+            yield {'form_action': form, 'payload': payload, 'category': category,
+                   'result': result, 'status': status, 'elapsed': elapsed or 0, 'parameter': parameter}
+
+    def iter_vulnerabilities(self):
+        self.flush()
+        cur = self.conn.execute("""
+            SELECT type, confidence, evidence, payload, form, response_code, signature, parameter FROM vulnerabilities
+            WHERE result_id = ? ORDER BY id
+        """, (self.result_id,))
+        for vtype, confidence, evidence, payload, form, code, signature, parameter in cur:
+            yield {'type': vtype, 'confidence': confidence, 'evidence': evidence, 'payload': payload,
+                   'form': form, 'response_code': code, 'signature': signature, 'parameter': parameter}
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from collections import defaultdict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class FuzzScheduler:
+    def __init__(self, handler, concurrency=10, per_host_concurrency=4, queue_size=None):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        # 큐가 가득 차면 producer가 대기 → 작업 목록 전체를 메모리에 올리지 않음
+        self.queue = asyncio.Queue(maxsize=queue_size or self.concurrency * 4)
+        self.host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host_concurrency))
+        self.completed = 0
+        self.failed = 0
+
+    def host_of(self, url):
+        return urlparse(url).netloc
+
+    async def submit(self, host, *job):
+        await self.queue.put((host, job))
+
+    async def worker(self, worker_id):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            host, job = item
+            try:
+                async with self.host_limits[host]:
+                    await self.handler(*job)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"[Scheduler] worker-{worker_id} job failed: {repr(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def run(self, jobs):
+        workers = [asyncio.create_task(self.worker(i)) for i in range(self.concurrency)]
+        try:
+            for host, *job in jobs:
+                await self.submit(host, *job)
+            await self.queue.join()
+        finally:
+            for _ in workers:
+                await self.queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+        logger.info(f"[Scheduler] {self.completed} jobs done, {self.failed} failed "
+                    f"(workers={self.concurrency}, per_host={self.per_host_concurrency})")
@@ -0,0 +1,83 @@
+import re
+from collections import namedtuple
+
+Signature = namedtuple('Signature', ['name', 'pattern', 'categories', 'ignore_case'])
+SignatureHit = namedtuple('SignatureHit', ['name', 'categories', 'start', 'end'])
+
+# 같은 위치에서 겹치는 시그니처는 더 구체적인 것을 먼저 두고, 해당하는 카테고리를 모두 지정
+SIGNATURES = [
+    # SQL 오류 메시지
+    Signature('mysql_syntax_error', r"you have an error in your sql syntax", ('sql_injection',), True),
+    Signature('mssql_unclosed_quote', r"unclosed quotation mark", ('sql_injection',), True),
+    Signature('mysql_warning', r"warning.*mysql", ('sql_injection',), True),
+    Signature('pg_query_error', r"pg_query\(\):", ('sql_injection',), True),
+    Signature('oracle_error', r"ORA-\d+", ('sql_injection',), True),
+    Signature('sql_syntax_error', r"syntax error.*sql", ('sql_injection',), True),
+    Signature('sql_unexpected_end', r"unexpected end of SQL command", ('sql_injection',), True),
+    # 명령 실행 결과
+    Signature('win_dir_listing', r"Directory of", ('command_injection',), False),
+    Signature('win_bytes_free', r"bytes free", ('command_injection',), False),
+    Signature('win_volume_serial', r"Volume Serial Number", ('command_injection',), False),
+    Signature('passwd_root_entry', r"root:x:0:0", ('command_injection', 'path_traversal'), False),
+    Signature('passwd_root', r"root:x", ('path_traversal',), False),
+    Signature('ls_permissions', r"drwxr-xr-x", ('command_injection',), False),
+    Signature('ls_total', r"total [0-9]+", ('command_injection',), False),
+    # 템플릿 표현식 평가 결과
+    Signature('ssti_braces', r"\{\{49\}\}", ('ssti',), False),
+    Signature('ssti_dollar', r"\$\{49\}", ('ssti',), False),
+    Signature('ssti_result', r"49", ('ssti',), False),
+    # CSRF 거부 메시지
+    Signature('csrf_keyword', r"csrf", ('csrf',), True),
+    Signature('csrf_token_missing', r"token missing", ('csrf',), True),
+    Signature('csrf_unauthorized', r"unauthorized", ('csrf',), True),
+]
+
+XSS_SNIPPET_MARKERS = re.compile(r"<script|onerror=|alert\(|<svg|onload=")
+
+
+def compile_signatures(signatures):
+    parts = []
+    for index, sig in enumerate(signatures):
+        flags = '(?i:' if sig.ignore_case else '(?:'
+        parts.append(f"(?P<s{index}>{flags}{sig.pattern}))")
+    return re.compile('|'.join(parts))
+
+
+class SignatureEngine:
+    def __init__(self, signatures=SIGNATURES):
+        self.signatures = list(signatures)
+        self.pattern = compile_signatures(self.signatures)
+        self.categories = {c for sig in self.signatures for c in sig.categories}
+
+    def iter_hits(self, text):
+        pos = 0
+        search = self.pattern.search
+        while True:
+            m = search(text, pos)
+            if not m:
+                return
+            sig = self.signatures[int(m.lastgroup[1:])]
+            yield SignatureHit(sig.name, sig.categories, m.start(), m.end())
+            # 다음 탐색은 match 끝이 아니라 시작 다음부터 → 긴 패턴에 가려진 시그니처도 탐지
+            pos = m.start() + 1
+
+    def scan(self, text, categories=None):
+        # 응답 본문을 한 번만 훑어서 카테고리별 첫 번째 일치 시그니처를 반환
+        hits = {}
+        if not text:
+            return hits
+        wanted = set(categories) & self.categories if categories else self.categories
+        for hit in self.iter_hits(text):
+            for category in hit.categories:
+                if category in wanted:
+                    hits.setdefault(category, hit)
+            if len(hits) == len(wanted):
+                break
+        return hits
+
+
+default_engine = SignatureEngine()
+
+
+def scan(text, categories=None):
+    return default_engine.scan(text, categories)
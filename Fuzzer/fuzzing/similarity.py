@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_MODES = ('exact', 'simhash', 'levenshtein')
+TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+
+def levenshtein_distance(s1, s2):
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def common_prefix_length(s1, s2):
+    # 슬라이스 비교(C 레벨)로 이진 탐색
+    lo, hi = 0, min(len(s1), len(s2))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if s1[:mid] == s2[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def strip_common_affixes(s1, s2):
+    start = common_prefix_length(s1, s2)
+    s1, s2 = s1[start:], s2[start:]
+    end = common_prefix_length(s1[::-1], s2[::-1])
+    return s1[:len(s1) - end], s2[:len(s2) - end]
+
+
+def char_count_bound(s1, s2):
+    # 문자 빈도 차이는 편집 거리의 하한
+    c1, c2 = Counter(s1), Counter(s2)
+    return max(sum((c1 - c2).values()), sum((c2 - c1).values()))
+
+
+def bounded_levenshtein(s1, s2, limit):
+    """Edit distance of s1 and s2, or limit + 1 as soon as it must exceed limit.
+
+    Bit-parallel (Myers/Hyyrö) over Python ints: one pass over the longer
+    string, with the shorter one packed into a bit vector.
+    """
+    if abs(len(s1) - len(s2)) > limit:
+        return limit + 1
+    s1, s2 = strip_common_affixes(s1, s2)
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+    m, n = len(s1), len(s2)
+    if m == 0:
+        return n if n <= limit else limit + 1
+
+    peq = {}
+    for i, c in enumerate(s1):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+
+    for j, c in enumerate(s2):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        # 남은 문자로 줄일 수 있는 거리보다 이미 크면 조기 종료
+        if score - (n - j - 1) > limit:
+            return limit + 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score if score <= limit else limit + 1
+
+
+def simhash(text, shingle_size=4, bits=64):
+    tokens = TOKEN_RE.findall(text)
+    if len(tokens) < shingle_size:
+        shingles = [' '.join(tokens)]
+    else:
+        shingles = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    weights = [0] * bits
+    for shingle, count in Counter(shingles).items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8', 'ignore'), digest_size=bits // 8).digest(), 'big')
+        for b in range(bits):
+            weights[b] += count if h >> b & 1 else -count
+    return sum(1 << b for b in range(bits) if weights[b] > 0)
+
+
+def simhash_distance(h1, h2):
+    return bin(h1 ^ h2).count('1')
+
+
+def dom_text_lines(text):
+    try:
+        from lxml import html as lxml_html
+        content = lxml_html.fromstring(text).text_content()
+    except Exception:
+        content = re.sub(r'<[^>]+>', ' ', text)
+    return [line.strip() for line in content.splitlines() if line.strip()]
+
+
+class SimilarityEngine:
+    def __init__(self, mode='exact', dom_text=False, simhash_bits=64, simhash_threshold=None, cache_size=64):
+        if mode not in SIMILARITY_MODES:
+            raise ValueError(f"Unknown similarity mode: {mode}")
+        self.mode = mode
+        self.dom_text = dom_text
+        self.simhash_bits = simhash_bits
+        # 미지정 시 ratio threshold 0.2 → 64비트 중 약 8비트 초과로 다르면 다르다고 판단
+        self.simhash_threshold = simhash_threshold
+        self.cache_size = cache_size
+        self.cache = {}
+        # analysis_mode='thread'에서는 여러 분석 스레드가 같은 엔진을 공유
+        self.cache_lock = threading.Lock()
+
+    def cached(self, kind, text, fn):
+        # baseline처럼 반복 비교되는 텍스트의 전처리 결과를 재사용
+        key = (kind, hash(text), len(text))
+        with self.cache_lock:
+            if key in self.cache:
+                return self.cache[key]
+        # 계산은 잠금 밖에서 (두 스레드가 같은 값을 동시에 계산해도 결과는 같음)
+        value = fn(text)
+        with self.cache_lock:
+            if key not in self.cache and len(self.cache) >= self.cache_size:
+                self.cache.pop(next(iter(self.cache)))
+            self.cache[key] = value
+        return value
+
+    def changed_text(self, text1, text2):
+        lines1 = Counter(self.cached('dom', text1, dom_text_lines))
+        lines2 = Counter(self.cached('dom', text2, dom_text_lines))
+        # 양쪽에 공통인 줄은 제외하고 바뀐 텍스트만 비교
+        return '\n'.join((lines1 - lines2).elements()), '\n'.join((lines2 - lines1).elements()), \
+            max(sum(len(l) for l in lines1.elements()), sum(len(l) for l in lines2.elements()))
+
+    def differs(self, text1, text2, threshold=0.2):
+        if not text1 or not text2:
+            return False
+        if self.dom_text:
+            text1, text2, max_len = self.changed_text(text1, text2)
+            if not max_len:
+                return False
+        else:
+            max_len = max(len(text1), len(text2))
+
+        if self.mode == 'levenshtein':
+            return levenshtein_distance(text1, text2) / max_len > threshold
+
+        # 1) 길이 차이만으로 이미 임계값 초과
+        if abs(len(text1) - len(text2)) / max_len > threshold:
+            return True
+        # 2) 동일한 본문
+        if text1 == text2:
+            return False
+
+        if self.mode == 'simhash':
+            bits = self.simhash_threshold or max(1, int(self.simhash_bits * threshold * 0.65))
+            h1 = self.cached('simhash', text1, lambda t: simhash(t, bits=self.simhash_bits))
+            h2 = self.cached('simhash', text2, lambda t: simhash(t, bits=self.simhash_bits))
+            return simhash_distance(h1, h2) > bits
+
+        # 3) 문자 빈도 하한, 4) 조기 종료 편집 거리
+        if char_count_bound(text1, text2) / max_len > threshold:
+            return True
+        limit = int(threshold * max_len) + 1
+        return bounded_levenshtein(text1, text2, limit) / max_len > threshold
+
+
+def distance_ratio(text1, text2):
+    max_len = max(len(text1), len(text2))
+    if not max_len:
+        return 0.0
+    return bounded_levenshtein(text1, text2, max_len) / max_len
@@ -4,16 +4,19 @@ import os
 import sys
 import urllib.robotparser
 from urllib.parse import urljoin
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 
-from crawler.static_crawler import StaticCrawler
-from crawler.dynamic_crawler import crawl_dynamic
-from fuzzing.async_fuzzer import AsyncFuzzer
+from crawler.pipeline import crawl_pipeline
+from fuzzing.async_fuzzer import PAYLOAD_ORDERS, AsyncFuzzer, fuzz_options_from
+from fuzzing.form_index import FormIndex
+from fuzzing.budget import budget_from_options
+from fuzzing.bandit import BANDIT_POLICIES
+from fuzzing.placement import PLACEMENT_MODES
+from crawler.inventory import plan_incremental
 from reporting.report_generator import generate_pdf_report
 
 os.makedirs("results", exist_ok=True)
 log_path = "results/fuzzer_logs.txt"
+DEFAULT_REPORT_PATH = "results/fuzzer_report.pdf"
 
 # 커스텀 포맷터 클래스
 class CustomFormatter(logging.Formatter):
@@ -63,7 +66,9 @@ def print_banner():
     )
 
 
-def main(base_url=None, max_depth=None, selected_categories=None):
+def main(base_url=None, max_depth=None, selected_categories=None, sink=None, group_inputs=False, fuzz_options=None,
+         budget=None, checkpoint=None, inventory=None, incremental=False, report_path=DEFAULT_REPORT_PATH,
+         progress=None):
     print_banner()
 
     if base_url is None or max_depth is None or selected_categories is None:
@@ -86,6 +91,69 @@ def main(base_url=None, max_depth=None, selected_categories=None):
             logger.error("❌ 유효한 페이로드 유형이 없습니다. 종료합니다.")
             exit(1)
 
+        if budget is None:
+            logger.info("⏱  스캔 한도 설정 (빈 칸으로 두면 무제한)")
+            try:
+                budget = budget_from_options({
+                    'max_requests': input("  최대 요청 수: ").strip(),
+                    'max_duration': input("  최대 소요 시간(초): ").strip(),
+                    'max_requests_per_endpoint': input("  엔드포인트당 최대 요청 수: ").strip(),
+                    'max_findings_per_endpoint': input("  엔드포인트·유형당 최대 탐지 수: ").strip(),
+                })
+            except ValueError:
+                logger.error("❌ 스캔 한도는 양수로 입력해주세요. 종료합니다.")
+                exit(1)
+
+        if fuzz_options is None:
+            logger.info("⚙  퍼징 옵션 설정 (빈 칸으로 두면 기본값)")
+            try:
+                fuzz_options = fuzz_options_from({
+                    'placement': input(f"  페이로드 배치 방식 ({'/'.join(PLACEMENT_MODES)}): ").strip(),
+                    'fuzz_hidden': input("  hidden 필드도 퍼징 (y/N): ").strip(),
+                    'two_phase': input("  프로브에 반응한 파라미터에만 전체 페이로드 전송 (y/N): ").strip(),
+                    'mutate': input("  탐지되지 않은 파라미터에 변이 페이로드 추가 전송 (y/N): ").strip(),
+                    'payload_order': input(f"  페이로드 순서 ({'/'.join(PAYLOAD_ORDERS)}): ").strip(),
+                    'bandit_policy': input(f"  밴딧 정책 ({'/'.join(BANDIT_POLICIES)}): ").strip(),
+                })
+            except ValueError as e:
+                logger.error(f"❌ 잘못된 퍼징 옵션입니다: {e}. 종료합니다.")
+                exit(1)
+
+    # max_duration은 크롤링부터 계산
+    if budget is not None:
+        budget.start()
+
+    crawled_url_set, extraction, forms = collect_forms(base_url, max_depth, group_inputs, checkpoint, inventory,
+                                                      incremental, progress)
+    if checkpoint and budget is not None:
+        checkpoint.save_budget(budget.state())
+
+    logger.info("🚀 퍼징 시작...")
+    if progress:
+        progress.set_stage('fuzzing')
+    fuzzer = AsyncFuzzer(forms, selected_categories, base_url=base_url, sink=sink, budget=budget,
+                         checkpoint=checkpoint, progress=progress, **(fuzz_options or {}))
+    if forms:
+        asyncio.run(fuzzer.run())
+    else:
+        logger.warning("⚠ 퍼징할 폼이 없습니다.")
+
+    # 예산으로 중간에 멈춘 스캔은 다음 증분 스캔의 기준으로 쓰지 않음 (건너뛴 폼이 '변경 없음'으로 취급되므로)
+    if inventory and not fuzzer.budget.reason:
+        inventory.save_pages(extraction)
+
+    # report_path가 None이면 리포트는 호출 측이 따로 (백그라운드에서) 생성
+    if report_path:
+        if progress:
+            progress.set_stage('report')
+        write_report(crawled_url_set, extraction, fuzzer.vulnerabilities, fuzzer.attempts, report_path)
+
+    return list(crawled_url_set), extraction, fuzzer.vulnerabilities, fuzzer.attempts
+
+
+def collect_forms(base_url, max_depth, group_inputs=False, checkpoint=None, inventory=None, incremental=False,
+                  progress=None):
+    # 크롤링 → 폼 중복 제거 → (증분 모드) 퍼징할 폼 선별
     rp = urllib.robotparser.RobotFileParser()
     rp.set_url(urljoin(base_url, '/robots.txt'))
     try:
@@ -93,56 +161,58 @@ def main(base_url=None, max_depth=None, selected_categories=None):
     except:
         logger.warning("⚠ robots.txt 로드 실패, 무시하고 진행합니다.")
 
-    logger.info("🔎 정적 크롤링 중...")
-    static_urls = StaticCrawler(base_url, rp).crawl()
+    # 증분 모드: 같은 타겟의 이전 스캔 페이지/탐지 결과를 기준으로 바뀐 부분만 퍼징
+    previous = inventory.previous() if inventory and incremental else None
+    if incremental and not previous:
+        logger.info("ℹ 이전 스캔 기록이 없어 전체 스캔으로 진행합니다.")
 
-    logger.info("🎥 동적 크롤링 중...")
-    options = Options()
-    options.add_argument('--headless')
-    driver = webdriver.Chrome(options=options)
-
-    visited, extraction = set(), []
-    # 수정된 부분: entry_url은 항상 문자열이어야 함
-    if static_urls:
-        entry_url = static_urls[0]['url']
+    saved_crawl = checkpoint.load_crawl() if checkpoint else None
+    if saved_crawl:
+        logger.info("🔁 체크포인트의 크롤링 결과를 재사용합니다.")
+        crawled_url_set, extraction = saved_crawl
     else:
-        entry_url = base_url
-    crawl_dynamic(driver, entry_url, max_depth, visited, extraction, rp)
-
-    driver.quit()
+        logger.info("🔎 크롤링 중... (정적 → 필요한 페이지만 동적)")
+        if progress:
+            progress.set_stage('crawling')
+        crawled_url_set, extraction = crawl_pipeline(base_url, max_depth, rp, checkpoint=checkpoint,
+                                                     previous_pages=previous.pages if previous else None,
+                                                     progress=progress)
+        if checkpoint:
+            checkpoint.save_crawl(crawled_url_set, extraction)
 
     logger.info("📝 폼 수집 중...")
-    forms = []
-    for result in extraction:
-        forms.extend(result['forms'])
-        for field in result['independent_inputs']:
-            if field.get('name'):
-                forms.append({'action': result['url'], 'method': 'get', 'inputs': [field]})
-
-    logger.info("🚀 퍼징 시작...")
-    if forms:
-        fuzzer = AsyncFuzzer(forms, selected_categories, base_url=base_url)
-        asyncio.run(fuzzer.run())
-    else:
-        logger.warning("⚠ 퍼징할 폼이 없습니다.")
-        fuzzer = AsyncFuzzer(forms, selected_categories, base_url=base_url)
-        fuzzer.vulnerabilities, fuzzer.attempts = [], []
-
+    form_index = FormIndex(group_inputs=group_inputs)
+    form_index.add_extraction(extraction)
+    form_index.log_summary()
+    forms = form_index.forms()
+    if previous:
+        forms = plan_incremental(forms, previous, group_inputs)
+    if progress:
+        for form in forms:
+            progress.emit('form', action=form.get('action'), method=form.get('method', 'get'),
+                          inputs=[i.get('name') for i in form.get('inputs', []) if i.get('name')])
+    return crawled_url_set, extraction, forms
+
+
+def appendix_path_for(report_path):
+    # results/fuzzer_report_<hash>.pdf → results/fuzzer_report_<hash>_attempts.csv
+    return os.path.splitext(report_path)[0] + "_attempts.csv"
+
+
+def write_report(crawled_url_set, extraction, vulnerabilities, attempts, report_path=DEFAULT_REPORT_PATH,
+                 report_mode='auto'):
     logger.info("📄 PDF 리포트 생성 중...")
-    # static_urls는 dict의 리스트, visited는 set of str
-    # static_urls에서 url만 추출해서 visited와 합침
-    crawled_url_set = set([r['url'] for r in static_urls]) | visited
     generate_pdf_report(
         crawled_urls=crawled_url_set,
         extraction_results=extraction,
-        vulnerabilities=fuzzer.vulnerabilities,
-        attempts=fuzzer.attempts,
-        output_path="results/fuzzer_report.pdf"
+        vulnerabilities=vulnerabilities,
+        attempts=attempts,
+        output_path=report_path,
+        mode=report_mode,
+        appendix_path=appendix_path_for(report_path)
     )
 
-    logger.info("✅ 퍼징 완료 및 리포트 저장됨: results/fuzzer_report.pdf")
-
-    return list(crawled_url_set), extraction, fuzzer.vulnerabilities, fuzzer.attempts
+    logger.info(f"✅ 퍼징 완료 및 리포트 저장됨: {report_path} (전체 시도: {appendix_path_for(report_path)})")
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+import csv
+import json
 import os
 from datetime import datetime
 from html import escape
@@ -11,6 +13,24 @@ from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 )
 
+# 'full': 모든 시도를 표로 나열, 'summary': 엔드포인트/카테고리별 요약 + 탐지 결과만 전체 나열
+# 'auto': 시도 수가 FULL_LISTING_LIMIT 이하면 full, 넘으면 summary
+REPORT_MODES = ('auto', 'full', 'summary')
+FULL_LISTING_LIMIT = 1000
+# 표 하나의 행 수. 큰 표 하나 대신 여러 표로 나눠서 레이아웃 비용을 행 수에 비례하게 유지
+TABLE_CHUNK_ROWS = 200
+
+APPENDIX_FIELDS = ('form_action', 'parameter', 'category', 'payload', 'result', 'status', 'elapsed')
+NO_FINDING_RESULTS = ('No vulnerability detected', 'Timeout', 'Failed')
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('FONTNAME', (0, 0), (-1, 0), 'NanumGothic-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'NanumGothic'),
+])
+
 def register_fonts(font_dir='fonts/'):
     nanum = os.path.join(font_dir, 'NanumGothic.ttf')
     nanum_bold = os.path.join(font_dir, 'NanumGothicBold.ttf')
@@ -22,11 +42,93 @@ def register_fonts(font_dir='fonts/'):
 def safe_escape(text):
     return escape(str(text)) if text else ''
 
-def generate_pdf_report(crawled_urls, extraction_results, vulnerabilities, attempts, output_path='results/fuzzer_report.pdf'):
+
+class LazyFlowables(list):
+    # doc.build는 목록 앞에서부터 하나씩 꺼내 배치함 → 비었을 때만 제너레이터에서 다음 플로어블을 채워서
+    # 리포트 전체를 메모리에 만들지 않음
+    def __init__(self, source):
+        super().__init__()
+        self.source = iter(source)
+
+    def __len__(self):
+        if not super().__len__():
+            for flowable in self.source:
+                self.append(flowable)
+                break
+        return super().__len__()
+
+
+def chunked_tables(header, rows, col_widths, chunk_rows=TABLE_CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield Table([header] + chunk, colWidths=col_widths, repeatRows=1, style=TABLE_STYLE)
+            chunk = []
+    if chunk:
+        yield Table([header] + chunk, colWidths=col_widths, repeatRows=1, style=TABLE_STYLE)
+
+
+def section(title, tables, empty_text, styles, note=None):
+    yield Paragraph(title, styles['SectionHeader'])
+    if note:
+        yield Paragraph(note, styles['NormalText'])
+    empty = True
+    for table in tables:
+        empty = False
+        yield table
+    if empty:
+        yield Paragraph(empty_text, styles['NormalText'])
+
+
+def appendix_writer(path, jsonl=False):
+    f = open(path, 'w', encoding='utf-8', newline='')
+    if jsonl:
+        return f, lambda attempt: f.write(json.dumps({k: attempt.get(k) for k in APPENDIX_FIELDS},
+                                                     ensure_ascii=False) + '\n')
+    writer = csv.DictWriter(f, fieldnames=APPENDIX_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    return f, writer.writerow
+
+
+def summarize_attempts(attempts, appendix_path=None):
+    # 시도를 한 번만 훑으면서 (엔드포인트, 카테고리)별 집계 + 원본 부록 파일 기록
+    summary = {}
+    # 부록 확장자가 .jsonl이면 JSON Lines, 아니면 CSV
+    f, write = appendix_writer(appendix_path + '.part', appendix_path.endswith('.jsonl')) if appendix_path \
+        else (None, None)
+    try:
+        for attempt in attempts:
+            key = (attempt.get('form_action', ''), attempt.get('category', ''))
+            row = summary.setdefault(key, {'attempts': 0, 'detected': 0, 'errors': 0, 'elapsed': 0.0})
+            result = attempt.get('result', '')
+            row['attempts'] += 1
+            row['detected'] += result not in NO_FINDING_RESULTS
+            row['errors'] += result in ('Timeout', 'Failed')
+            row['elapsed'] += attempt.get('elapsed') or 0
+            if write:
+                write(attempt)
+    finally:
+        if f:
+            f.close()
+    if appendix_path:
+        os.replace(appendix_path + '.part', appendix_path)
+    return summary
+
+
+def generate_pdf_report(crawled_urls, extraction_results, vulnerabilities, attempts, output_path='results/fuzzer_report.pdf',
+                        mode='auto', appendix_path=None):
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Unknown report mode: {mode}")
     register_fonts()
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if mode == 'auto':
+        mode = 'full' if len(attempts) <= FULL_LISTING_LIMIT else 'summary'
+    attempt_summary = summarize_attempts(attempts, appendix_path)
 
-    doc = SimpleDocTemplate(output_path, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=30)
+    # 다 만들어진 뒤에만 최종 경로에 나타나도록 임시 파일에 만든 뒤 교체
+    partial_path = output_path + '.part'
+    doc = SimpleDocTemplate(partial_path, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=30)
     styles = getSampleStyleSheet()
 
     custom_styles = {
@@ -39,81 +141,78 @@ def generate_pdf_report(crawled_urls, extraction_results, vulnerabilities, attem
     for k, v in custom_styles.items():
         styles.add(v)
 
-    flowables = []
-    flowables.append(Spacer(1, 200))
-    flowables.append(Paragraph("웹 퍼저 리포트", styles['TitleCustom']))
-    flowables.append(Paragraph(datetime.now().strftime('%Y-%m-%d %H:%M:%S'), styles['Date']))
-    flowables.append(PageBreak())
-
-    flowables.append(Paragraph("목차", styles['TOCHeader']))
-    toc_items = ["1. 크롤링 URL", "2. 입력 폼 정보", "3. 퍼징 탐지 결과"]
-    for item in toc_items:
-        flowables.append(Paragraph(item, styles['NormalText']))
-    flowables.append(PageBreak())
-
-    flowables.append(Paragraph("1. 크롤링 URL", styles['SectionHeader']))
-    if crawled_urls:
-        data = [[Paragraph("크롤링한 URL", styles['NormalText'])]] + [[Paragraph(safe_escape(url), styles['NormalText'])] for url in crawled_urls]
-        table = Table(data, colWidths=[480])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, 0), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), 'NanumGothic-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'NanumGothic'),
-        ]))
-        flowables.append(table)
-    else:
-        flowables.append(Paragraph("크롤링한 URL이 없습니다.", styles['NormalText']))
-    flowables.append(PageBreak())
-
-    flowables.append(Paragraph("2. 입력 폼 정보", styles['SectionHeader']))
-    if extraction_results:
-        data = [["URL", "폼 액션", "메소드", "입력 필드"]]
+    def text(value):
+        return Paragraph(safe_escape(value), styles['NormalText'])
+
+    def url_rows():
+        for url in sorted(crawled_urls):
+            yield [text(url)]
+
+    def form_rows():
         for result in extraction_results:
             for form in result.get('forms', []):
                 inputs = ', '.join([f"{i.get('name')} ({i.get('type')})" for i in form.get('inputs', [])])
-                data.append([
-                    Paragraph(safe_escape(result.get('url', '')), styles['NormalText']),
-                    Paragraph(safe_escape(form.get('action', '')), styles['NormalText']),
-                    Paragraph(safe_escape(form.get('method', '').upper()), styles['NormalText']),
-                    Paragraph(safe_escape(inputs), styles['NormalText'])
-                ])
-        table = Table(data, colWidths=[120, 120, 60, 180])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), 'NanumGothic-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'NanumGothic'),
-        ]))
-        flowables.append(table)
-    else:
-        flowables.append(Paragraph("폼 정보가 없습니다.", styles['NormalText']))
-    flowables.append(PageBreak())
-
-    flowables.append(Paragraph("3. 퍼징 탐지 결과", styles['SectionHeader']))
-    if attempts:
-        data = [["카테고리", "폼 액션", "페이로드", "탐지 결과", "HTTP 상태", "응답 시간"]]
+                yield [text(result.get('url', '')), text(form.get('action', '')),
+                       text(form.get('method', '').upper()), text(inputs)]
+
+    def finding_rows():
+        for v in vulnerabilities:
+            yield [text(v.get('type', '')), text(v.get('form', '')), text(v.get('parameter', '')),
+                   text(v.get('payload', '')), text(str(v.get('confidence', ''))), text(v.get('response_code', ''))]
+
+    def summary_rows():
+        for (action, category), row in sorted(attempt_summary.items(), key=lambda item: tuple(map(str, item[0]))):
+            yield [text(action), text(category), text(str(row['attempts'])), text(str(row['detected'])),
+                   text(str(row['errors'])), text(f"{row['elapsed'] / row['attempts']:.2f}s")]
+
+    def attempt_rows():
         for attempt in attempts:
-            data.append([
-                Paragraph(safe_escape(attempt.get('category', '')), styles['NormalText']),
-                Paragraph(safe_escape(attempt.get('form_action', '')), styles['NormalText']),
-                Paragraph(safe_escape(attempt.get('payload', '')), styles['NormalText']),
-                Paragraph(safe_escape(attempt.get('result', '')), styles['NormalText']),
-                Paragraph(str(attempt.get('status', '')), styles['NormalText']),
-                Paragraph(f"{attempt.get('elapsed', 0):.2f}s", styles['NormalText'])
-            ])
-        table = Table(data, colWidths=[60, 120, 120, 90, 60, 60])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), 'NanumGothic-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'NanumGothic'),
-        ]))
-        flowables.append(table)
-    else:
-        flowables.append(Paragraph("퍼징 탐지 결과가 없습니다.", styles['NormalText']))
-
-    doc.build(flowables)
+            yield [text(attempt.get('category', '')), text(attempt.get('form_action', '')),
+                   text(attempt.get('payload', '')), text(attempt.get('result', '')),
+                   Paragraph(str(attempt.get('status', '')), styles['NormalText']),
+                   Paragraph(f"{attempt.get('elapsed', 0):.2f}s", styles['NormalText'])]
+
+    def flowables():
+        yield Spacer(1, 200)
+        yield Paragraph("웹 퍼저 리포트", styles['TitleCustom'])
+        yield Paragraph(datetime.now().strftime('%Y-%m-%d %H:%M:%S'), styles['Date'])
+        yield PageBreak()
+
+        yield Paragraph("목차", styles['TOCHeader'])
+        toc_items = ["1. 크롤링 URL", "2. 입력 폼 정보", "3. 탐지된 취약점", "4. 엔드포인트별 퍼징 요약"]
+        if mode == 'full':
+            toc_items.append("5. 퍼징 시도 전체 목록")
+        for item in toc_items:
+            yield Paragraph(item, styles['NormalText'])
+        yield PageBreak()
+
+        yield from section("1. 크롤링 URL",
+                           chunked_tables([text("크롤링한 URL")], url_rows(), [480]),
+                           "크롤링한 URL이 없습니다.", styles)
+        yield PageBreak()
+        yield from section("2. 입력 폼 정보",
+                           chunked_tables(["URL", "폼 액션", "메소드", "입력 필드"], form_rows(), [120, 120, 60, 180]),
+                           "폼 정보가 없습니다.", styles)
+        yield PageBreak()
+        yield from section("3. 탐지된 취약점",
+                           chunked_tables(["유형", "폼 액션", "파라미터", "페이로드", "신뢰도", "HTTP 상태"],
+                                          finding_rows(), [80, 110, 60, 130, 45, 55]),
+                           "탐지된 취약점이 없습니다.", styles)
+        yield PageBreak()
+
+        note = None
+        if appendix_path:
+            note = safe_escape(f"전체 시도 기록(원본)은 별도 파일로 저장됨: {os.path.basename(appendix_path)}")
+        yield from section("4. 엔드포인트별 퍼징 요약",
+                           chunked_tables(["폼 액션", "카테고리", "시도", "탐지", "타임아웃/실패", "평균 응답 시간"],
+                                          summary_rows(), [150, 90, 50, 50, 70, 70]),
+                           "퍼징 시도가 없습니다.", styles, note)
+        if mode == 'full':
+            yield PageBreak()
+            yield from section("5. 퍼징 시도 전체 목록",
+                               chunked_tables(["카테고리", "폼 액션", "페이로드", "탐지 결과", "HTTP 상태", "응답 시간"],
+                                              attempt_rows(), [60, 120, 120, 90, 60, 60]),
+                               "퍼징 탐지 결과가 없습니다.", styles)
+
+    doc.build(LazyFlowables(flowables()))
+    os.replace(partial_path, output_path)
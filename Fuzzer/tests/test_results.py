@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from database.results import attempts_page, result_summary
+from database.schema import connect
+from fuzzing.result_sink import SQLiteSink
+
+
+class ResultFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.dir.name, 'test.db')
+        sink = SQLiteSink(self.db_path, 1)
+        sink.add_attempt({'form_action': '/a', 'payload': "'", 'category': 'sql_injection',
+                          'result': 'No vulnerability detected', 'status': 200, 'elapsed': 0.1})
+        sink.add_attempt({'form_action': '/a', 'payload': "'", 'category': 'sql_injection',
+                          'result': 'Timeout', 'status': 'N/A', 'elapsed': 0})
+        sink.close()
+        self.db = connect(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.dir.cleanup()
+
+    def test_timeout_row_matches_summary_status_label(self):
+        self.assertEqual(result_summary(self.db, 1)['byStatus'], {'200': 1, 'N/A': 1})
+        page = attempts_page(self.db, 1, {'status': 'N/A'})
+        self.assertEqual([item['response'] for item in page['items']], ['Timeout'])
+
+    def test_empty_status_matches_summary_status_label(self):
+        self.db.execute("INSERT INTO attempts (result_id, form, response, status) VALUES (1, '/b', 'Failed', NULL)")
+        self.db.commit()
+        page = attempts_page(self.db, 1, {'status': 'N/A'})
+        self.assertEqual([item['response'] for item in page['items']], ['Timeout', 'Failed'])
+
+    def test_unknown_category_matches_empty_category(self):
+        self.db.execute("INSERT INTO attempts (result_id, form, response, category) VALUES (1, '/b', 'Failed', '')")
+        self.db.commit()
+        self.assertEqual(result_summary(self.db, 1)['byCategory'], {'sql_injection': 2, 'unknown': 1})
+        page = attempts_page(self.db, 1, {'category': 'unknown'})
+        self.assertEqual([item['form'] for item in page['items']], ['/b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from collections import Counter, deque
+
+# 이벤트 종류별로 집계하는 카운터 이름
+COUNTED_EVENTS = {'page': 'pages', 'form': 'forms', 'request': 'requests', 'finding': 'findings'}
+
+
+class ScanProgress:
+    # 스캔 중 발생한 구조화된 이벤트(stage, page, form, request, finding, log)를 담는 링 버퍼
+    # seq는 스캔 전체에서 단조 증가 → 클라이언트마다 마지막으로 받은 seq 다음부터 이어서 읽음
+    def __init__(self, capacity=5000, stats_interval=1.0, rate_window=5.0):
+        self.events = deque(maxlen=capacity)
+        self.next_seq = 0
+        self.cond = threading.Condition()
+        self.counters = Counter()
+        self.stage = 'queued'
+        self.planned = None
+        self.finished = False
+        self.result_hash = None
+        self.started = time.monotonic()
+        # req/s, % 계산은 stats_interval마다 한 번만 (클라이언트 수와 무관)
+        self.stats_interval = stats_interval
+        self.rate_window = rate_window
+        self.request_times = deque()
+        self.cached_stats = None
+        self.stats_at = 0.0
+        # tick()으로 집계만 한 이벤트의 가장 최근 값 (stats의 current로 전달)
+        self.latest = {}
+
+    def emit(self, kind, **data):
+        with self.cond:
+            event = dict(data, seq=self.next_seq, kind=kind, ts=round(time.time(), 3))
+            self.next_seq += 1
+            self.events.append(event)
+            if kind in COUNTED_EVENTS:
+                self.counters[COUNTED_EVENTS[kind]] += 1
+            if kind == 'request':
+                self.request_times.append(time.monotonic())
+            self.cond.notify_all()
+
+    def tick(self, kind, **data):
+        # 요청처럼 아주 잦은 이벤트는 버퍼에 넣지 않고 집계만 → stats_interval마다 stats 이벤트 하나로 전달
+        with self.cond:
+            if kind in COUNTED_EVENTS:
+                self.counters[COUNTED_EVENTS[kind]] += 1
+            if kind == 'request':
+                self.request_times.append(time.monotonic())
+            self.latest[kind] = data
+
+    def set_stage(self, stage):
+        self.stage = stage
+        self.emit('stage', stage=stage)
+
+    def plan(self, requests):
+        # 예상 요청 수 (% 계산용)
+        self.planned = requests
+
+    def finish(self, result_hash=None, error=None):
+        with self.cond:
+            self.result_hash = result_hash
+            self.stage = 'failed' if error else 'done'
+            self.finished = True
+            self.cached_stats = None
+        self.emit('stage', stage=self.stage, error=error)
+
+    def since(self, offset):
+        # (offset 이후 이벤트, 버퍼에서 밀려나 놓친 이벤트 수, 다음 offset)
+        with self.cond:
+            first = self.events[0]['seq'] if self.events else self.next_seq
+            dropped = max(0, first - offset)
+            events = [e for e in self.events if e['seq'] >= offset]
+            return events, dropped, self.next_seq
+
+    def wait(self, offset, timeout):
+        with self.cond:
+            self.cond.wait_for(lambda: self.next_seq > offset or self.finished, timeout)
+        return self.since(offset)
+
+    def stats(self):
+        now = time.monotonic()
+        with self.cond:
+            if self.cached_stats is not None and now - self.stats_at < self.stats_interval:
+                return self.cached_stats
+            while self.request_times and now - self.request_times[0] > self.rate_window:
+                self.request_times.popleft()
+            window = max(1.0, min(self.rate_window, now - self.started))
+            percent = None
+            if self.finished:
+                percent = 100
+            elif self.planned:
+                # 변이 라운드 등으로 예상보다 많아질 수 있으므로 끝나기 전에는 99%까지만
+                percent = min(99, int(self.counters['requests'] * 100 / self.planned))
+            self.cached_stats = dict(
+                self.counters,
+                stage=self.stage,
+                planned=self.planned,
+                percent=percent,
+                rate=round(len(self.request_times) / window, 1),
+                elapsed=round(now - self.started, 1),
+                current=self.latest.get('request')
+            )
+            self.stats_at = now
+            return self.cached_stats
+
+
+def sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def sse_stream(progress, offset=0, kinds=None, keepalive=15.0):
+    # Server-Sent Events 스트림. 브라우저가 재연결하면 Last-Event-ID로 offset을 이어받음
+    last_stats = None
+    idle = 0.0
+    while True:
+        events, dropped, offset = progress.wait(offset, timeout=progress.stats_interval)
+        sent = False
+        if dropped:
+            yield sse('dropped', {'count': dropped})
+            sent = True
+        for event in events:
+            if kinds is None or event['kind'] in kinds:
+                yield sse(event['kind'], event, event['seq'])
+                sent = True
+        stats = progress.stats()
+        if stats is not last_stats:
+            # 걸러낸 이벤트도 받은 것으로 치도록 id를 함께 보냄
+            yield sse('stats', stats, offset - 1 if offset else None)
+            last_stats = stats
+            sent = True
+        if progress.finished and offset >= progress.next_seq:
+            yield sse('done', {'result_hash': progress.result_hash, 'stage': progress.stage})
+            return
+        idle = 0.0 if sent else idle + progress.stats_interval
+        if idle >= keepalive:
+            yield ": keep-alive\n\n"
+            idle = 0.0
@@ -0,0 +1,351 @@
+import json
+import threading
+import time
+import uuid
+from collections import Counter, namedtuple
+
+from database.schema import connect, init_db
+
+Job = namedtuple('Job', ['id', 'kind', 'scan', 'parent', 'payload', 'attempts'])
+
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+LEASE_EXPIRED_ERROR = "Lease expired after max attempts"
+
+# 대기열에서 꺼내기 + 임대 등록을 한 번에 → 둘 사이에 워커가 죽어도 작업이 큐와 임대 목록 양쪽에서 사라지지 않음
+# KEYS: queue, leases / ARGV: 작업 키 접두어, 임대 만료 시각, worker id
+REDIS_CLAIM = """
+local job_id = redis.call('RPOP', KEYS[1])
+if not job_id then
+    return false
+end
+local job_key = ARGV[1] .. job_id
+redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+redis.call('HSET', job_key, 'status', 'running', 'worker', ARGV[3])
+redis.call('HINCRBY', job_key, 'attempts', 1)
+return job_id
+"""
+
+# 임대가 만료된 작업을 다시 큐로. 실행 횟수를 다 쓴 작업(워커를 계속 죽이는 작업)은 failed로 끝내고,
+# 그 때문에 형제 작업이 모두 끝난 작업 id를 반환
+# KEYS: leases, queue / ARGV: 현재 시각, 작업 키 접두어, 최대 실행 횟수, pending 키 접두어, 오류 메시지
+REDIS_REAP = """
+local finished = {}
+for _, job_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], 0, ARGV[1])) do
+    redis.call('ZREM', KEYS[1], job_id)
+    local job_key = ARGV[2] .. job_id
+    if tonumber(redis.call('HGET', job_key, 'attempts') or '0') >= tonumber(ARGV[3]) then
+        redis.call('HSET', job_key, 'status', 'failed', 'error', ARGV[5])
+        local parent = redis.call('HGET', job_key, 'parent')
+        if parent and parent ~= '' and redis.call('DECR', ARGV[4] .. parent) == 0 then
+            table.insert(finished, job_id)
+        end
+    else
+        redis.call('HSET', job_key, 'status', 'queued')
+        redis.call('RPUSH', KEYS[2], job_id)
+    end
+end
+return finished
+"""
+
+
+def make_broker(url):
+    # sqlite:///webfuzzer.db 또는 redis://localhost:6379/0
+    if url.startswith('sqlite:///'):
+        return SQLiteBroker(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported broker URL: {url}")
+
+
+def scan_state(counts):
+    # scan 단위 상태: report 작업까지 끝나야 완료
+    if not counts:
+        return 'unknown'
+    if counts.get('report:done'):
+        return 'done'
+    if counts.get('scan:failed') or counts.get('report:failed'):
+        return 'failed'
+    if any(k.endswith(':running') for k in counts):
+        return 'running'
+    return 'queued'
+
+
+class SQLiteBroker:
+    # 웹 앱과 워커가 같은 SQLite 파일(WAL)을 큐로 사용. 임대(lease)가 만료된 작업은 다른 워커가 다시 가져감
+    def __init__(self, db_path, lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        init_db(db_path)
+        self.conn = connect(db_path, isolation_level=None)
+
+    def transaction(self, fn):
+        # BEGIN IMMEDIATE: 여러 프로세스가 동시에 claim/complete 해도 한 번에 하나씩 처리
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.conn)
+                self.conn.execute("COMMIT")
+                return result
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, kind, payload, scan, parent=None):
+        return self.enqueue_many(kind, [payload], scan, parent)[0]
+
+    def insert_jobs(self, conn, kind, payloads, scan, parent=None):
+        ids = []
+        for payload in payloads:
+            cur = conn.execute(
+                "INSERT INTO scan_jobs (kind, scan, parent, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, scan, parent, json.dumps(payload, ensure_ascii=False), time.time()))
+            ids.append(cur.lastrowid)
+        return ids
+
+    def enqueue_many(self, kind, payloads, scan, parent=None):
+        return self.transaction(lambda conn: self.insert_jobs(conn, kind, payloads, scan, parent))
+
+    def claim(self, worker_id, parent_follow_ups=None):
+        now = time.time()
+
+        def take(conn):
+            # 실행 횟수를 다 쓰고도 임대가 만료된 작업(워커를 계속 죽이는 작업)은 다시 내주지 않고 실패 처리
+            for job_id, scan, parent in conn.execute("""
+                SELECT id, scan, parent FROM scan_jobs
+                WHERE status = 'running' AND lease_until < ? AND attempts >= ?
+            """, (now, self.max_attempts)).fetchall():
+                conn.execute(
+                    "UPDATE scan_jobs SET status = 'failed', error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (LEASE_EXPIRED_ERROR, now, job_id))
+                self.finish_parent(conn, scan, parent, parent_follow_ups)
+            row = conn.execute("""
+                SELECT id, kind, scan, parent, payload, attempts FROM scan_jobs
+                WHERE status = 'queued' OR (status = 'running' AND lease_until < ? AND attempts < ?)
+                ORDER BY id LIMIT 1
+            """, (now, self.max_attempts)).fetchone()
+            if not row:
+                return None
+            conn.execute("""
+                UPDATE scan_jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1,
+                       updated_at = ?
+                WHERE id = ?
+            """, (worker_id, now + self.lease, now, row[0]))
+            job_id, kind, scan, parent, payload, attempts = row
+            return Job(job_id, kind, scan, parent, json.loads(payload), attempts + 1)
+        return self.transaction(take)
+
+    def heartbeat(self, job_id, worker_id, progress=None):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE scan_jobs SET lease_until = ?, progress = COALESCE(?, progress), updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (now + self.lease, json.dumps(progress) if progress is not None else None, now, job_id, worker_id))
+
+    def finish(self, job_id, worker_id, status, result=None, error=None, follow_ups=(), parent_follow_ups=None):
+        # 작업 종료 + 결과 저장 + 후속 작업 등록을 한 트랜잭션으로. 이 워커가 아직 임대 중인 작업일 때만 반영
+        # (임대가 만료돼 다른 워커가 가져간 작업을 이전 워커가 늦게 끝내면 False)
+        # follow_ups: [(kind, payloads, parent)], parent_follow_ups(parent): 형제 작업이 모두 끝났을 때 등록할 작업
+        def update(conn):
+            cur = conn.execute(
+                "UPDATE scan_jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error,
+                 time.time(), job_id, worker_id))
+            if cur.rowcount == 0:
+                return False
+            scan, parent = conn.execute("SELECT scan, parent FROM scan_jobs WHERE id = ?", (job_id,)).fetchone()
+            for kind, payloads, job_parent in follow_ups:
+                self.insert_jobs(conn, kind, payloads, scan, job_parent)
+            self.finish_parent(conn, scan, parent, parent_follow_ups)
+            return True
+        return self.transaction(update)
+
+    def finish_parent(self, conn, scan, parent, parent_follow_ups):
+        # 트랜잭션 안에서 호출: 형제 작업이 모두 끝났으면 parent_follow_ups(parent)의 작업을 등록
+        if parent is None or not parent_follow_ups:
+            return
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM scan_jobs WHERE parent = ? AND status NOT IN ('done', 'failed')",
+            (parent,)).fetchone()[0]
+        if pending == 0:
+            for kind, payloads, job_parent in parent_follow_ups(parent):
+                self.insert_jobs(conn, kind, payloads, scan, job_parent)
+
+    def complete(self, job_id, worker_id, result=None, follow_ups=(), parent_follow_ups=None):
+        return self.finish(job_id, worker_id, 'done', result, follow_ups=follow_ups,
+                           parent_follow_ups=parent_follow_ups)
+
+    def fail(self, job_id, worker_id, error, attempts, parent_follow_ups=None):
+        # 재시도 횟수가 남았으면 다시 큐로
+        if attempts < self.max_attempts:
+            with self.lock:
+                cur = self.conn.execute(
+                    "UPDATE scan_jobs SET status = 'queued', error = ?, lease_until = NULL, updated_at = ? "
+                    "WHERE id = ? AND worker = ? AND status = 'running'",
+                    (error, time.time(), job_id, worker_id))
+            return cur.rowcount > 0
+        return self.finish(job_id, worker_id, 'failed', error=error, parent_follow_ups=parent_follow_ups)
+
+    def result(self, job_id):
+        with self.lock:
+            row = self.conn.execute("SELECT result FROM scan_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def final_attempts(self, scan, kind):
+        # 작업별 마지막 실행 번호 — 이전 실행(재시도/임대 만료)이 남긴 결과 행을 정리할 때 사용
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT id, attempts FROM scan_jobs WHERE scan = ? AND kind = ?", (scan, kind)).fetchall())
+
+    def scan_status(self, scan):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT kind, status, progress FROM scan_jobs WHERE scan = ?", (scan,)).fetchall()
+        counts, progress = Counter(), Counter()
+        for kind, status, job_progress in rows:
+            counts[f"{kind}:{status}"] += 1
+            for key, value in json.loads(job_progress or '{}').items():
+                progress[key] += value
+        return {'state': scan_state(counts), 'jobs': dict(counts), 'progress': dict(progress)}
+
+
+class RedisBroker:
+    # Redis 호환 서버용. 작업은 해시(wf:job:<id>), 대기열은 리스트, 임대는 sorted set(점수 = 만료 시각)
+    def __init__(self, url, lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, prefix='wf'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RedisBroker requires the 'redis' package (pip install redis)")
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+
+    def key(self, *parts):
+        return ':'.join((self.prefix,) + tuple(str(p) for p in parts))
+
+    def enqueue(self, kind, payload, scan, parent=None):
+        return self.enqueue_many(kind, [payload], scan, parent)[0]
+
+    def queue_jobs(self, pipe, kind, payloads, scan, parent=None):
+        ids = []
+        for payload in payloads:
+            job_id = uuid.uuid4().hex
+            ids.append(job_id)
+            pipe.hset(self.key('job', job_id), mapping={
+                'kind': kind, 'scan': scan, 'parent': parent or '', 'payload': json.dumps(payload, ensure_ascii=False),
+                'status': 'queued', 'attempts': 0
+            })
+            pipe.sadd(self.key('scan', scan), job_id)
+            if parent:
+                pipe.incr(self.key('pending', parent))
+            pipe.lpush(self.key('queue'), job_id)
+        return ids
+
+    def enqueue_many(self, kind, payloads, scan, parent=None):
+        pipe = self.redis.pipeline()
+        ids = self.queue_jobs(pipe, kind, payloads, scan, parent)
+        pipe.execute()
+        return ids
+
+    def requeue_expired(self, parent_follow_ups=None):
+        finished = self.redis.eval(
+            REDIS_REAP, 2, self.key('leases'), self.key('queue'),
+            time.time(), self.key('job', ''), self.max_attempts, self.key('pending', ''), LEASE_EXPIRED_ERROR)
+        # 스크립트에서 pending을 0으로 만든 호출은 한 번뿐이므로 후속 작업도 한 번만 등록됨
+        for job_id in finished:
+            scan, parent = self.redis.hmget(self.key('job', job_id), 'scan', 'parent')
+            if parent_follow_ups:
+                for kind, payloads, job_parent in parent_follow_ups(parent):
+                    self.enqueue_many(kind, payloads, scan, job_parent)
+
+    def claim(self, worker_id, parent_follow_ups=None):
+        self.requeue_expired(parent_follow_ups)
+        job_id = self.redis.eval(REDIS_CLAIM, 2, self.key('queue'), self.key('leases'),
+                                 self.key('job', ''), time.time() + self.lease, worker_id)
+        if not job_id:
+            return None
+        job = self.redis.hgetall(self.key('job', job_id))
+        return Job(job_id, job['kind'], job['scan'], job['parent'] or None, json.loads(job['payload']),
+                   int(job['attempts']))
+
+    def owns(self, job_key, worker_id):
+        status, worker = self.redis.hmget(job_key, 'status', 'worker')
+        return status == 'running' and worker == worker_id
+
+    def heartbeat(self, job_id, worker_id, progress=None):
+        if not self.owns(self.key('job', job_id), worker_id):
+            return
+        self.redis.zadd(self.key('leases'), {job_id: time.time() + self.lease}, xx=True)
+        if progress is not None:
+            self.redis.hset(self.key('job', job_id), 'progress', json.dumps(progress))
+
+    def finish(self, job_id, worker_id, status, result=None, error=None, follow_ups=(), parent_follow_ups=None,
+               requeue=False):
+        # 작업 해시를 WATCH → 임대 만료로 재등록되거나 다른 워커가 가져가면(둘 다 해시를 수정) 트랜잭션이 취소됨
+        # → 같은 작업을 두 워커가 끝내도 상태 변경, 후속 작업 등록, pending 감소는 한 번만 일어남
+        import redis
+        job_key = self.key('job', job_id)
+        fields = {'status': status}
+        if result is not None:
+            fields['result'] = json.dumps(result, ensure_ascii=False)
+        if error is not None:
+            fields['error'] = error
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(job_key)
+                    if not self.owns(job_key, worker_id):
+                        return False
+                    scan, parent = pipe.hmget(job_key, 'scan', 'parent')
+                    pipe.multi()
+                    pipe.zrem(self.key('leases'), job_id)
+                    pipe.hset(job_key, mapping=fields)
+                    if requeue:
+                        pipe.rpush(self.key('queue'), job_id)
+                    for kind, payloads, job_parent in follow_ups:
+                        self.queue_jobs(pipe, kind, payloads, scan, job_parent)
+                    if parent and not requeue:
+                        pipe.decr(self.key('pending', parent))
+                    results = pipe.execute()
+                    break
+                except redis.WatchError:
+                    continue
+        # DECR은 위 트랜잭션에서 작업당 한 번만 실행되므로 마지막 형제 작업을 끝낸 워커만 0을 받음
+        if parent and not requeue and results[-1] == 0 and parent_follow_ups:
+            for kind, payloads, job_parent in parent_follow_ups(parent):
+                self.enqueue_many(kind, payloads, scan, job_parent)
+        return True
+
+    def complete(self, job_id, worker_id, result=None, follow_ups=(), parent_follow_ups=None):
+        return self.finish(job_id, worker_id, 'done', result, follow_ups=follow_ups,
+                           parent_follow_ups=parent_follow_ups)
+
+    def fail(self, job_id, worker_id, error, attempts, parent_follow_ups=None):
+        if attempts < self.max_attempts:
+            return self.finish(job_id, worker_id, 'queued', error=error, requeue=True)
+        return self.finish(job_id, worker_id, 'failed', error=error, parent_follow_ups=parent_follow_ups)
+
+    def result(self, job_id):
+        value = self.redis.hget(self.key('job', job_id), 'result')
+        return json.loads(value) if value else None
+
+    def final_attempts(self, scan, kind):
+        attempts = {}
+        for job_id in self.redis.smembers(self.key('scan', scan)):
+            job_kind, job_attempts = self.redis.hmget(self.key('job', job_id), 'kind', 'attempts')
+            if job_kind == kind:
+                attempts[job_id] = int(job_attempts or 0)
+        return attempts
+
+    def scan_status(self, scan):
+        counts, progress = Counter(), Counter()
+        for job_id in self.redis.smembers(self.key('scan', scan)):
+            job = self.redis.hmget(self.key('job', job_id), 'kind', 'status', 'progress')
+            counts[f"{job[0]}:{job[1]}"] += 1
+            for key, value in json.loads(job[2] or '{}').items():
+                progress[key] += value
+        return {'state': scan_state(counts), 'jobs': dict(counts), 'progress': dict(progress)}
@@ -0,0 +1,123 @@
+import asyncio
+import math
+
+from crawler.inventory import ScanInventory
+from database.schema import connect
+from fuzzing.async_fuzzer import AsyncFuzzer, fuzz_options_from
+from fuzzing.budget import budget_from_options
+from fuzzing.result_sink import SQLiteSink
+from main import collect_forms, write_report
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 워커 프로세스 안에서 이미 병렬로 돌고 있으므로 분석은 스레드 풀로 충분
+WORKER_FUZZ_OPTIONS = {'analysis_mode': 'thread'}
+
+
+class JobContext:
+    def __init__(self, broker, db_path, worker_id=None):
+        self.broker = broker
+        self.db_path = db_path
+        self.worker_id = worker_id
+        # 작업 완료와 같은 트랜잭션에서 등록할 후속 작업 [(kind, payloads, parent)]
+        self.follow_ups = []
+        # heartbeat 스레드가 주기적으로 호출해 작업 진행 상황을 브로커에 기록
+        self.progress = None
+
+
+def split_budget(budget, parts):
+    # 전체 요청 한도는 하위 작업 수로 나눠서 적용, 나머지 한도는 작업마다 그대로 적용
+    budget = dict(budget or {})
+    if budget.get('max_requests') and parts:
+        budget['max_requests'] = max(1, math.ceil(int(budget['max_requests']) / parts))
+    return budget
+
+
+def run_scan_job(ctx, job):
+    # 크롤링 + 폼 선별까지만 하고, 엔드포인트×카테고리 단위 fuzz 작업으로 쪼개서 큐에 넣음
+    p = job.payload
+    inventory = ScanInventory(ctx.db_path, p['result_id'], p['target_url'])
+    try:
+        crawled_url_set, extraction, forms = collect_forms(p['target_url'], p['max_depth'], p.get('group_inputs', False),
+                                                           inventory=inventory, incremental=p.get('incremental'))
+    finally:
+        inventory.close()
+
+    lanes = [(form, category) for form in forms for category in p['payloads']
+             if 'payloads' not in form or form['payloads'].get(category)]
+    budget = split_budget(p.get('budget'), len(lanes))
+    children = [{'result_id': p['result_id'], 'target_url': p['target_url'], 'form': form, 'category': category,
+                 'budget': budget, 'fuzz': p.get('fuzz') or {}} for form, category in lanes]
+    if children:
+        ctx.follow_ups.append(('fuzz', children, job.id))
+    else:
+        ctx.follow_ups.append(('report', [{'scan_job': job.id}], None))
+    logger.info(f"[Worker] Scan {job.scan}: {len(forms)} forms → {len(children)} fuzz jobs")
+    return {'urls': sorted(crawled_url_set), 'extraction': extraction, 'scan': p}
+
+
+def run_fuzz_job(ctx, job):
+    p = job.payload
+    budget = budget_from_options(p.get('budget') or {})
+    # 행마다 (작업, 실행 번호)를 남겨서 재시도되면 이전 실행이 남긴 행을 지움
+    sink = SQLiteSink(ctx.db_path, p['result_id'], job=(job.id, job.attempts))
+    if job.attempts > 1:
+        sink.discard_other_runs(job.id, job.attempts)
+    fuzzer = AsyncFuzzer([p['form']], [p['category']], base_url=p['target_url'], sink=sink, budget=budget,
+                         **dict(WORKER_FUZZ_OPTIONS, **fuzz_options_from(p.get('fuzz') or {})))
+    # 같은 결과에 다른 fuzz 작업들도 기록하므로 시작 시점의 집계를 기준으로 삼음
+    base_attempts, base_vulns = sink.attempt_count, sink.vuln_count
+
+    def progress():
+        return {'requests': budget.requests, 'attempts': sink.attempt_count - base_attempts,
+                'vulnerabilities': sink.vuln_count - base_vulns, 'stopped': int(bool(budget.reason))}
+    ctx.progress = progress
+    try:
+        asyncio.run(fuzzer.run())
+    finally:
+        sink.close()
+    ctx.broker.heartbeat(job.id, ctx.worker_id, progress())
+    return progress()
+
+
+def run_report_job(ctx, job):
+    scan = ctx.broker.result(job.payload['scan_job'])
+    p = scan['scan']
+    sink = SQLiteSink(ctx.db_path, p['result_id'])
+    try:
+        # 임대가 만료된 뒤에도 계속 돌던 이전 실행이 남긴 행은 마지막 실행 것만 남기고 정리
+        for fuzz_job, attempt in ctx.broker.final_attempts(job.scan, 'fuzz').items():
+            sink.discard_other_runs(fuzz_job, attempt)
+        write_report(set(scan['urls']), scan['extraction'], sink.vulnerabilities, sink.attempts, p['report_path'])
+        vuln_count = sink.vuln_count
+    finally:
+        sink.close()
+
+    status = ctx.broker.scan_status(job.scan)
+    conn = connect(ctx.db_path)
+    try:
+        conn.execute("UPDATE results SET vuln_count = ? WHERE id = ?", (vuln_count, p['result_id']))
+        conn.commit()
+    finally:
+        conn.close()
+    # 예산으로 멈춘 fuzz 작업이 있으면 다음 증분 스캔의 기준으로 쓰지 않음
+    if not status['progress'].get('stopped'):
+        inventory = ScanInventory(ctx.db_path, p['result_id'], p['target_url'])
+        inventory.save_pages(scan['extraction'])
+        inventory.close()
+
+    with open(p['log_path'], 'w', encoding='utf-8') as f:
+        f.write(f"scan {job.scan}: {status['state']}\n")
+        for key, value in sorted(status['jobs'].items()):
+            f.write(f"  jobs {key}: {value}\n")
+        for key, value in sorted(status['progress'].items()):
+            f.write(f"  {key}: {value}\n")
+    return {'vulnerabilities': vuln_count}
+
+
+HANDLERS = {
+    'scan': run_scan_job,
+    'fuzz': run_fuzz_job,
+    'report': run_report_job,
+}
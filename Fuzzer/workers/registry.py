@@ -0,0 +1,159 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+from utils.progress import ScanProgress
+
+logger = logging.getLogger(__name__)
+
+# 현재 스레드/태스크가 실행 중인 스캔. 스캔 스레드 안의 asyncio 태스크에는 자동으로 전달되고,
+# 다른 스레드로 넘길 때는 contextvars.copy_context().run 으로 감싸야 함
+current_scan = contextvars.ContextVar('current_scan', default=None)
+
+# 진행 스트림(SSE 링 버퍼)에는 WARNING 이상만 모두 넣고, INFO는 초당 LOG_STREAM_RATE줄(최대 LOG_STREAM_BURST줄 연속)
+# 까지만 샘플링 → 요청마다 찍히는 INFO 로그가 버퍼를 밀어내지 않음. 로그 파일에는 전부 기록
+LOG_STREAM_LEVEL = logging.WARNING
+LOG_STREAM_RATE = 2.0
+LOG_STREAM_BURST = 20
+
+
+class ScanState:
+    # 스캔 하나의 상태: 진행 이벤트 버퍼 + 전용 로그 파일
+    def __init__(self, result_hash, result_id, user_id=None, log_path=None):
+        self.result_hash = result_hash
+        self.result_id = result_id
+        self.user_id = user_id
+        self.log_path = log_path
+        self.progress = ScanProgress()
+        self.status = 'queued'
+        self.error = None
+        self.finished_at = None
+        self.thread = None
+        self.log_lock = threading.Lock()
+        self.log_file = None
+        self.log_tokens = LOG_STREAM_BURST
+        self.log_refilled = time.monotonic()
+
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def write_log(self, level, message, levelno=logging.INFO):
+        with self.log_lock:
+            if self.log_path:
+                if self.log_file is None:
+                    self.log_file = open(self.log_path, 'a', encoding='utf-8')
+                self.log_file.write(message + '\n')
+                self.log_file.flush()
+            stream = levelno >= LOG_STREAM_LEVEL or self.take_log_token()
+        # 스캔이 끝난 뒤(백그라운드 리포트 등)의 로그는 파일에만 기록 — 진행 스트림은 이미 닫힘
+        if stream and not self.progress.finished:
+            self.progress.emit('log', level=level, message=message)
+
+    def take_log_token(self):
+        # self.log_lock을 잡은 상태에서 호출 (INFO 로그 토큰 버킷)
+        now = time.monotonic()
+        self.log_tokens = min(LOG_STREAM_BURST, self.log_tokens + (now - self.log_refilled) * LOG_STREAM_RATE)
+        self.log_refilled = now
+        if self.log_tokens < 1:
+            return False
+        self.log_tokens -= 1
+        return True
+
+    def close_log(self):
+        with self.log_lock:
+            if self.log_file:
+                self.log_file.close()
+                self.log_file = None
+
+
+class ScanLogRouter(logging.Handler):
+    # 루트 로거에 하나만 붙여 두고, 레코드를 발생시킨 스캔(current_scan)의 로그로 보냄
+    def __init__(self, level=logging.INFO):
+        super().__init__(level)
+        self.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    def emit(self, record):
+        scan = current_scan.get()
+        if scan is None:
+            return
+        try:
+            scan.write_log(record.levelname, self.format(record), record.levelno)
+        except Exception:
+            self.handleError(record)
+
+
+class ScanRegistry:
+    # result_hash → ScanState. 동시에 max_concurrent개까지 실행하고 나머지는 순서대로 대기
+    def __init__(self, max_concurrent=2, keep_finished=100):
+        self.max_concurrent = max_concurrent
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.scans = OrderedDict()
+        self.waiting = deque()
+        self.running = set()
+
+    def get(self, result_hash):
+        with self.lock:
+            return self.scans.get(result_hash)
+
+    def is_active(self, result_hash):
+        state = self.get(result_hash)
+        return state is not None and state.active()
+
+    def active_hashes(self):
+        with self.lock:
+            return {h for h, state in self.scans.items() if state.active()}
+
+    def submit(self, state, target, *args):
+        # target(state, *args)를 스캔 스레드에서 실행. 같은 해시의 스캔이 진행 중이면 ValueError
+        with self.lock:
+            existing = self.scans.get(state.result_hash)
+            if existing is not None and existing.active():
+                raise ValueError(f"Scan already active: {state.result_hash}")
+            self.scans[state.result_hash] = state
+            self.scans.move_to_end(state.result_hash)
+            if len(self.running) < self.max_concurrent:
+                self.start(state, target, args)
+            else:
+                self.waiting.append((state, target, args))
+                state.progress.emit('stage', stage='queued', position=len(self.waiting))
+                logger.info(f"[ScanRegistry] {state.result_hash} queued (position {len(self.waiting)})")
+        return state
+
+    def start(self, state, target, args):
+        # self.lock을 잡은 상태에서 호출
+        state.status = 'running'
+        self.running.add(state.result_hash)
+        state.thread = threading.Thread(target=self.run, args=(state, target, args),
+                                        name=f"scan-{state.result_hash[:8]}", daemon=True)
+        state.thread.start()
+
+    def run(self, state, target, args):
+        token = current_scan.set(state)
+        try:
+            target(state, *args)
+        except Exception as e:
+            state.error = str(e)
+            logger.exception(f"[ScanRegistry] Scan {state.result_hash} failed: {e}")
+        finally:
+            current_scan.reset(token)
+            state.close_log()
+
+        with self.lock:
+            state.status = 'failed' if state.error else 'done'
+            state.finished_at = time.time()
+            self.running.discard(state.result_hash)
+            if self.waiting:
+                self.start(*self.waiting.popleft())
+                for position, (waiting, _, _) in enumerate(self.waiting, 1):
+                    waiting.progress.emit('stage', stage='queued', position=position)
+            self.evict()
+        state.progress.finish(state.result_hash, state.error)
+
+    def evict(self):
+        # 끝난 스캔은 최근 keep_finished개만 메모리에 유지 (이후에는 DB/로그 파일로 조회)
+        finished = [h for h, state in self.scans.items() if not state.active()]
+        for result_hash in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.scans[result_hash]
@@ -0,0 +1,107 @@
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+
+from utils.logger import get_logger
+from workers.broker import LEASE_SECONDS, make_broker
+from workers.jobs import HANDLERS, JobContext
+
+logger = get_logger()
+
+POLL_INTERVAL = 2.0
+HEARTBEAT_INTERVAL = LEASE_SECONDS / 3
+
+
+class Heartbeat(threading.Thread):
+    # 작업이 도는 동안 임대를 연장하고 진행 상황을 기록 (멈춘 워커의 작업은 임대 만료 후 다른 워커가 가져감)
+    def __init__(self, broker, job, worker_id, ctx, interval=HEARTBEAT_INTERVAL):
+        super().__init__(daemon=True)
+        self.broker = broker
+        self.job = job
+        self.worker_id = worker_id
+        self.ctx = ctx
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                progress = self.ctx.progress() if self.ctx.progress else None
+                self.broker.heartbeat(self.job.id, self.worker_id, progress)
+            except Exception as e:
+                logger.warning(f"[Worker] Heartbeat failed for job {self.job.id}: {e}")
+
+    def stop(self):
+        self.stopped.set()
+
+
+def report_follow_ups(parent):
+    # 마지막 fuzz 작업을 끝낸 워커가 (같은 트랜잭션에서) 리포트 작업을 넣음
+    return [('report', [{'scan_job': parent}], None)]
+
+
+def run_job(broker, db_path, job, worker_id):
+    ctx = JobContext(broker, db_path, worker_id)
+    heartbeat = Heartbeat(broker, job, worker_id, ctx)
+    heartbeat.start()
+    try:
+        result = HANDLERS[job.kind](ctx, job)
+    except Exception as e:
+        heartbeat.stop()
+        logger.error(f"[Worker] {job.kind} job {job.id} failed (attempt {job.attempts}): {e}")
+        accepted = broker.fail(job.id, worker_id, traceback.format_exc(), job.attempts,
+                               parent_follow_ups=report_follow_ups)
+    else:
+        heartbeat.stop()
+        # 결과 저장과 하위 작업 등록을 함께 → 리포트 작업이 아직 저장되지 않은 스캔 결과를 읽지 않음
+        accepted = broker.complete(job.id, worker_id, result, follow_ups=ctx.follow_ups,
+                                   parent_follow_ups=report_follow_ups)
+    if not accepted:
+        logger.warning(f"[Worker] {job.kind} job {job.id} lease was lost; result discarded")
+
+
+def work(broker_url, db_path, worker_id=None, once=False):
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    broker = make_broker(broker_url)
+    logger.info(f"[Worker] {worker_id} listening on {broker_url}")
+    while True:
+        job = broker.claim(worker_id, parent_follow_ups=report_follow_ups)
+        if job is None:
+            if once:
+                return
+            time.sleep(POLL_INTERVAL)
+            continue
+        if job.kind not in HANDLERS:
+            broker.fail(job.id, worker_id, f"Unknown job kind: {job.kind}", broker.max_attempts,
+                        parent_follow_ups=report_follow_ups)
+            continue
+        logger.info(f"[Worker] {worker_id} took {job.kind} job {job.id} of scan {job.scan}")
+        run_job(broker, db_path, job, worker_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebFuzzer scan worker")
+    parser.add_argument('--broker', default=os.environ.get('SCAN_BROKER', 'sqlite:///webfuzzer.db'))
+    parser.add_argument('--db', default=os.environ.get('SCAN_DB', 'webfuzzer.db'),
+                        help="results DB shared with the web app")
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--once', action='store_true', help="exit when the queue is empty")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        work(args.broker, args.db, once=args.once)
+        return
+    processes = [multiprocessing.Process(target=work, args=(args.broker, args.db), kwargs={'once': args.once})
+                 for _ in range(args.processes)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()